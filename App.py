@@ -1,413 +1,196 @@
 import streamlit as st
 import os
-import re
 from dotenv import load_dotenv
-from langchain_groq import ChatGroq
-from langchain_core.prompts import ChatPromptTemplate
-from langchain_core.output_parsers import JsonOutputParser
 import base64
 import time
 import json
 import random
-import plotly.express as px  # Add this import
-import pygame  # Add this import
-
-# On Streamlit Cloud
-GROQ_API_KEY = st.secrets["GROQ_API_KEY"]
-
-# Model configurations
-MODEL_CONFIG = {
-    "deepseek-r1-distill-qwen-32b": {
-        "temperature": 0.3,
-        "max_retries": 5,
-        "question_prefix": "SQL question:"
-    },
-    "gemma2-9b-it": {
-        "temperature": 0.5,
-        "max_retries": 4,
-        "question_prefix": ""
-    },
-    "llama-3.3-70b-versatile": {
-        "temperature": 0.4,
-        "max_retries": 3,
-        "question_prefix": ""
-    }
-}
-# Define enhanced prompt templates with specified techniques
-APTITUDE_PROMPT = ChatPromptTemplate.from_messages([
-    ("system", """You are an expert in generating aptitude and logical reasoning questions. Use this process to create unique and diverse questions:
-
-    **Rules**:
-    1. Generate questions only from verified mathematical or logical principles.
-    2. Ensure there is a single correct answer for each question.
-    3. Avoid subjective interpretations, ambiguous phrasing, or overly complex scenarios.
-    4. Include a mix of quantitative and logical reasoning topics.
-    5. Do not use a default topic; generate questions from various stages/topics such as:
-       - Simple interest/Clocks/Calendars/Blood relations/Time and work/Speed and distance/Percentage/yllogisms/Arrangements (e.g., seating, order)/Logical deductions
-
-    **Instructions**:
-    - Focus on the given topic if provided. If no topic is specified, generate questions from different stages/topics listed above.
-    - Use clear and concise language for each question.
-    - Provide at least one example for clarity.
-
-    **Few-Shot Examples**:
-
-    ** Time and Work**
-    Question: "A can complete a task in 10 days, and B can complete the same task in 15 days. How long will it take for both A and B to complete the task together?"
-    Answer: 6 days (1 / (1/10 + 1/15) = 6)
-
-    **Output Rules**:
-    - Single question per output.
-    - No markdown formatting.
-    - Avoid using special characters like `**` at the start or end of questions.
-    - Include at least one example for clarity.
-    """),
-])
-
-CODING_PROMPT = ChatPromptTemplate.from_messages([
-    ("system", """You are an expert coder. Use the following Chain-of-Thought process to generate a coding problem:
-    
-    **Process:**
-    1. **Understand the Skill**: Identify the core concept or skill ({skill}) the problem should focus on.
-    2. **Define the Problem Context**: Create a real-world or abstract scenario where the skill is applied.
-    3. **Break Down the Problem**:
-       - Step 1: Clearly state the input(s) required for the problem.
-       - Step 2: Specify the expected output(s) or goal.
-       - Step 3: Outline any constraints or edge cases.
-    4. **Provide Examples**: Include at least one example with inputs and outputs to clarify the problem.
-    
-    **Rules**:
-    - Use clear and concise language.
-    - Avoid ambiguous terms or overly complex scenarios.
-    - Ensure the problem is solvable within a reasonable time frame.
-    - Include a mix of basic and advanced concepts to challenge the candidate.
-    
-    **Example**:
-    Skill: Arrays
-    Problem Statement: "Given an array of integers, find the two numbers that add up to a specific target value."
-    Input: An array of integers and a target value (e.g., [2, 7, 11, 15], target = 9).
-    Output: Indices of the two numbers that sum to the target (e.g., [0, 1]).
-    Constraints: You may assume there is exactly one solution, and you cannot use the same element twice.
-    Example: 
-      Input: [2, 7, 11, 15], target = 9
-      Output: [0, 1]
-    
-    **Output Rules**:
-    - Single problem per output.
-    - No markdown formatting."""),
-    ("human", """Generate a coding problem about {skill} with:""")
-])
-
-TECHNICAL_PROMPT = ChatPromptTemplate.from_messages([
-    ("system", """You are a technical interviewer for {role} positions. Structure questions using this framework:
-
-For {skill}, analyze through 5 lenses:
-1. Core Theory: Fundamental principles, mathematical foundations, domain laws
-2. System Dynamics: Interactions between components, failure cascades, feedback loops
-3. Implementation Reality: Tradeoffs, debugging nightmares, "it works on my machine" gaps
-4. Evolution: Historical solutions → current best practices → emerging alternatives
-5. Paradoxes: Situations where standard patterns contradict (e.g., CAP theorem)
-
-**Question Design Protocol**
-1. Select 2 knowledge layers → Identify tension/conflict
-2. Frame as concrete scenario requiring prioritization
-3. Demand explanation of ripple effects
-
-**Examples**
-
-1. Skill: Database Engineering  
-   Question: "When would you prioritize ACID compliance over horizontal scalability in a financial system? How does this choice impact disaster recovery strategies?"
-
-**Output Rules**
-1. Force candidate to choose between competing priorities
-2. Require explanation of second-order consequences
-3. Single question (<2 sentences)
-4. Ends with '?'
-5. No markdown"""),
-    
-    ("human", """Create a {skill} question using knowledge layers. {question_prefix}""")
-])
-BEHAVIORAL_PROMPT = ChatPromptTemplate.from_messages([
-    ("system", """You are a behavioral expert. Use the following structured process to generate behavioral questions:
-    
-    **Process:**
-    1. Start with the core skill ({skill}) and identify potential workplace challenges.
-    2. Use Chain-of-Thought reasoning to break down the scenario into logical steps:
-       - Step 1: Identify the challenge.
-       - Step 2: Frame the challenge as a real-world experience.
-       - Step 3: Tailor the question to the role ({role}).
-    3. Use few-shot learning with diverse examples to guide the generation of questions.
-    
-    **Few-Shot Examples:**
-    Example 1:
-    Core Skill: Communication
-    Role: Junior Developer
-    Question: "Describe a time when you had to explain a technical concept to a non-technical team member. How did you ensure they understood?"
-    
-    
-    **Rules:**
-    - Avoid hypothetical scenarios ("Imagine...").
-    - Use "Describe a time..." or "Tell me..." format.
-    - Adapt the complexity and focus based on the role (e.g., junior vs. senior).
-    - Ensure the question is concise (<2 sentences) and ends with '?'.
-    
-    **Output Rules:**
-    - Single question per output.
-    - No markdown formatting."""),
-    ("human", """Create a behavioral question about {skill} for {role}.
-    {question_prefix}""")
-])
-
-
-EVALUATION_PROMPT_TEMPLATE = """
-Evaluate the interview answer using these STRICT criteria (1-4 scale):
-1. Correctness: 
-   - 4: Fully accurate with no technical errors, covers all aspects
-   - 3: Mostly correct but missing minor details
-   - 2: Partially correct with significant gaps
-   - 0: Fundamentally incorrect
-2. Depth: 
-   - 4: Advanced concepts + examples + trade-offs + edge cases
-   - 3: Good detail but missing some aspects
-   - 2: Basic explanation only
-   - 1: Superficial treatment
-3. Relevance: 
-   - 4: Directly addresses all parts of question
-   - 3: Mostly relevant with minor tangents
-   - 2: Partially relevant
-   - 1: Off-topic
-Checklist for Depth:
-- [ ] Includes concrete examples/code snippets
-- [ ] Discusses performance implications
-- [ ] Mentions trade-offs/limitations
-- [ ] Addresses edge cases
-Question: {question}
-Answer: {answer}
-JSON Output Format:
-{{
-  "rubric": {{
-    "correctness": {{"score": 1-4, "reason": "detailed technical evaluation"}},
-    "depth": {{"score": 1-4, "reason": "depth analysis with checklist items"}},
-    "relevance": {{"score": 1-4, "reason": "relevance check"}}
-  }},
-  "strengths": ["key strengths"],
-  "suggestions": ["specific improvements based on checklist"],
-  "total_score": "sum of all scores (3-12)"
-}}
-"""
-EVALUATION_PROMPT = ChatPromptTemplate.from_template(EVALUATION_PROMPT_TEMPLATE)
-
-# Add images and developer information to the sidebar
-AI_path = "AI.png"  # Ensure this file is in the same directory as your script
-try:
-    st.sidebar.image(AI_path)
-except FileNotFoundError:
-    st.sidebar.warning("AI.png file not found. Please check the file path.")
-
-image_path = "image.png"  # Ensure this file is in the same directory as your script
+from assets import sidebar_image
+from background import BackgroundEvaluator, QuestionPrefetcher
+from eval_cache import evaluation_key, get_evaluation_cache
+from interview_state import InterviewState
+from interview_engine import (
+    HEDGE_AFTER_SECONDS,
+    MODEL_CONFIG,
+    evaluate_answer,
+    evaluate_answers_batch,
+    generate_question,
+    generate_questions_batch,
+    stream_question
+)
+from profiler import RerunProfile
+from session_store import get_session_store, new_token
+from telemetry import get_telemetry
+
+# Number of upcoming questions generated in the background while answering
+PREFETCH_DEPTH = 2
+# Number of answers graded concurrently per session
+EVALUATION_WORKERS = 2
+
+# Opt-in timing of each section of this script (see profiler.py)
+if "profile" not in st.session_state:
+    st.session_state.profile = RerunProfile()
+profile = st.session_state.profile
+profile.start()
+# finish() runs however the script ends, including st.rerun() and st.stop()
 try:
-    st.sidebar.image(image_path)
-except FileNotFoundError:
-    st.sidebar.warning("image.png file not found. Please check the file path.")
+    # Add images and developer information to the sidebar
+    AI_path = "AI.png"  # Ensure this file is in the same directory as your script
+    try:
+        st.sidebar.image(sidebar_image(AI_path), output_format="JPEG")
+    except FileNotFoundError:
+        st.sidebar.warning("AI.png file not found. Please check the file path.")
 
-st.sidebar.markdown("👨👨‍💻**Developer:** Abhishek💖Yadav")
+    image_path = "image.png"  # Ensure this file is in the same directory as your script
+    try:
+        st.sidebar.image(sidebar_image(image_path), output_format="JPEG")
+    except FileNotFoundError:
+        st.sidebar.warning("image.png file not found. Please check the file path.")
 
-developer_path = "pic.jpg"  # Ensure this file is in the same directory as your script
-try:
-    st.sidebar.image(developer_path)
-except FileNotFoundError:
-    st.sidebar.warning("pic.jpg file not found. Please check the file path.")
-
-# Add a difficulty selector in the sidebar
-difficulty = st.sidebar.selectbox(
-    "Difficulty Level:",
-    options=["Easy", "Medium", "Hard"],
-    index=0
-)
+    st.sidebar.markdown("👨👨‍💻**Developer:** Abhishek💖Yadav")
 
-# Adjust the timer and question complexity based on the selected difficulty
-difficulty_timer_map = {
-    "Easy": 90,  # 90 seconds for Easy
-    "Medium": 60,  # 60 seconds for Medium
-    "Hard": 30  # 30 seconds for Hard
-}
-st.session_state["timer"] = difficulty_timer_map[difficulty]
-
-# Adjust question generation logic based on difficulty
-def generate_question(role, skill, model_name, existing_questions, stage, difficulty):
-    config = MODEL_CONFIG.get(model_name, {})
-    max_retries = config.get("max_retries", 3)
-    prefix = config.get("question_prefix", "")
-
-    # Adjust prompt or complexity based on difficulty
-    if difficulty == "Easy":
-        prefix += " (Focus on basic concepts)"
-    elif difficulty == "Medium":
-        prefix += " (Include moderate complexity)"
-    elif difficulty == "Hard":
-        prefix += " (Include edge cases and advanced scenarios)"
-
-    for attempt in range(max_retries):
-        try:
-            model = ChatGroq(
-                temperature=config.get("temperature", 0.5),
-                groq_api_key=GROQ_API_KEY,
-                model_name=model_name
-            )
-            # Define the prompt based on the selected stage
-            if stage == "aptitude":
-                prompt = APTITUDE_PROMPT
-            elif stage == "coding":
-                prompt = CODING_PROMPT
-            elif stage == "technical":
-                prompt = TECHNICAL_PROMPT
-            elif stage == "behavioral":
-                prompt = BEHAVIORAL_PROMPT
-            else:
-                raise ValueError("Invalid stage selected")
-
-            chain = prompt | model
-            
-            existing_list = "\n".join([f"{i+1}. {q}" for i, q in enumerate(existing_questions[-5:])])
-            existing_display = f"Existing questions:\n{existing_list}" if existing_questions else "No existing questions"
-            
-            response = chain.invoke({
-                "role": role,
-                "skill": skill,
-                "existing_questions": existing_display,
-                "question_prefix": prefix
-            })
-            
-            raw_question = response.content.strip()
-            question = re.sub(r'\<.*?\>', '', raw_question, flags=re.DOTALL)
-            question = re.sub(r'\(.*?\)|Note:.*|```.*```', '', question)
-            question = re.split(r'\?|```', question)[0].strip() + '?'
-            question = question.replace('`', '').strip()
-            
-            # Prevent duplicates
-            question_core = re.sub(r'[^a-zA-Z0-9]', '', question.lower())
-            existing_cores = [re.sub(r'[^a-zA-Z0-9]', '', q.lower()) for q in existing_questions]
-            if not question.endswith('?'):
-                raise ValueError("Missing question mark")
-            if question_core in existing_cores:
-                raise ValueError("Duplicate question core detected")
-            if any(q in question for q in existing_questions):
-                raise ValueError("Partial duplicate detected")
-                
-            return question
-        except Exception as e:
-            st.toast(f"Retry {attempt+1}/{max_retries}: {str(e)}")
-            continue
-    return "❌ Failed to generate valid question after multiple attempts"
-
-def evaluate_answer(question, answer, model_name):
+    developer_path = "pic.jpg"  # Ensure this file is in the same directory as your script
     try:
-        model = ChatGroq(temperature=0.2, groq_api_key=GROQ_API_KEY, model_name=model_name)
-        chain = EVALUATION_PROMPT | model | JsonOutputParser()
-        response = chain.invoke({"question": question, "answer": answer})
-        
-        # Convert scores to integers and calculate totals
-        rubric_scores = {
-            "correctness": int(response["rubric"]["correctness"]["score"]),
-            "depth": int(response["rubric"]["depth"]["score"]),
-            "relevance": int(response["rubric"]["relevance"]["score"])
-        }
-        total_score = sum(rubric_scores.values())
-        binary_score = 1 if total_score >= 9 else 0  # Threshold at 9/12
-        
-        return {
-            "rubric_scores": rubric_scores,
-            "total_score": total_score,
-            "binary_score": binary_score,
-            "feedback": "\n".join([
-                f"**{k.title()}** ({v}/4): {response['rubric'][k]['reason']}"
-                for k, v in rubric_scores.items()
-            ]),
-            "strengths": response.get("strengths", []),
-            "suggestions": response.get("suggestions", [])
+        st.sidebar.image(sidebar_image(developer_path), output_format="JPEG")
+    except FileNotFoundError:
+        st.sidebar.warning("pic.jpg file not found. Please check the file path.")
+
+    # Add a difficulty selector in the sidebar
+    difficulty = st.sidebar.selectbox(
+        "Difficulty Level:",
+        options=["Easy", "Medium", "Hard"],
+        index=0
+    )
+
+    # Adjust the timer and question complexity based on the selected difficulty
+    difficulty_timer_map = {
+        "Easy": 90,  # 90 seconds for Easy
+        "Medium": 60,  # 60 seconds for Medium
+        "Hard": 30  # 30 seconds for Hard
+    }
+    st.session_state["timer_total"] = difficulty_timer_map[difficulty]
+
+
+    def get_text_download_link(content, filename):
+        b64 = base64.b64encode(content.encode()).decode()
+        return f'<a href="data:file/txt;base64,{b64}" download="{filename}">Download Results</a>'
+
+    # Function to generate options for a question
+    def generate_options(question, correct_answer):
+        # Generate three random incorrect answers based on the question context
+        incorrect_answers = []
+        while len(incorrect_answers) < 3:
+            # Example logic for generating incorrect answers
+            random_incorrect = f"Incorrect {random.randint(1, 100)}"
+            if random_incorrect != correct_answer and random_incorrect not in incorrect_answers:
+                incorrect_answers.append(random_incorrect)
+
+        # Combine correct and incorrect answers
+        options = incorrect_answers + [correct_answer]
+        random.shuffle(options)  # Shuffle the options
+        return options
+
+    # Add this function to generate hints dynamically or use predefined hints
+    def get_hint(question):
+        # Example: Generate a hint dynamically or return a predefined hint
+        predefined_hints = {
+            "Aptitude": "Break the problem into smaller parts and solve step by step.",
+            "Coding": "Think about edge cases and optimize your solution.",
+            "Technical": "Focus on trade-offs and system design principles.",
+            "Behavioral": "Reflect on a real-world experience that aligns with the question."
         }
-    except Exception as e:
+        return predefined_hints.get(st.session_state.stage, "Think carefully about the question.")
+
+    # Per-session background workers; these are never saved with the interview
+    def start_workers(stage):
         return {
-            "error": str(e),
-            "rubric_scores": {"correctness": 0, "depth": 0, "relevance": 0},
-            "total_score": 0,
-            "binary_score": 0,
-            "feedback": "Evaluation failed",
-            "strengths": [],
-            "suggestions": []
+            # Background threads have no script context, so retries are not toasted
+            "prefetcher": QuestionPrefetcher(
+                lambda **kwargs: generate_question(notify=None, **kwargs),
+                depth=PREFETCH_DEPTH
+            ),
+            # The stage decides which answers may be pre-scored without a model call
+            "evaluator": BackgroundEvaluator(
+                lambda question, answer, model_name: evaluate_answer(question, answer, model_name, stage),
+                max_workers=EVALUATION_WORKERS
+            )
         }
 
-def get_text_download_link(content, filename):
-    b64 = base64.b64encode(content.encode()).decode()
-    return f'<a href="data:file/txt;base64,{b64}" download="{filename}">Download Results</a>'
-
-# Function to generate options for a question
-def generate_options(question, correct_answer):
-    # Generate three random incorrect answers based on the question context
-    incorrect_answers = []
-    while len(incorrect_answers) < 3:
-        # Example logic for generating incorrect answers
-        random_incorrect = f"Incorrect {random.randint(1, 100)}"
-        if random_incorrect != correct_answer and random_incorrect not in incorrect_answers:
-            incorrect_answers.append(random_incorrect)
-    
-    # Combine correct and incorrect answers
-    options = incorrect_answers + [correct_answer]
-    random.shuffle(options)  # Shuffle the options
-    return options
-
-# Add this function to generate hints dynamically or use predefined hints
-def get_hint(question):
-    # Example: Generate a hint dynamically or return a predefined hint
-    predefined_hints = {
-        "Aptitude": "Break the problem into smaller parts and solve step by step.",
-        "Coding": "Think about edge cases and optimize your solution.",
-        "Technical": "Focus on trade-offs and system design principles.",
-        "Behavioral": "Reflect on a real-world experience that aligns with the question."
-    }
-    return predefined_hints.get(st.session_state.stage, "Think carefully about the question.")
-
-# Session State Initialization
-if "job_role" not in st.session_state:
-    st.session_state.update({
-        "job_role": "Select",
-        "skill": "Aptitude",
-        "questions": [],
-        "current_index": 0,
-        "answers": [],
-        "evaluations": [],
-        "rubric_totals": [],
-        "binary_scores": [],
-        "num_questions": 10,
-        "ready_next": False,
-        "selected_model": "gemma2-9b-it",
-        "prev_config": ("", "", "Aptitude", 10, "aptitude"),
-        "stage": "aptitude"
-    })
-
-with st.sidebar:
-    st.header("🛠 Interview Configuration")
-    
-    # Question range selector
-    st.session_state.num_questions = st.number_input(
-        "Number of Questions:",
-        min_value=1,
-        max_value=15,
-        value=10,
-        step=1
-    )
-    
-    model_options = list(MODEL_CONFIG.keys())
-    st.session_state.selected_model = st.selectbox(
-        "🤖 AI Model:",
-        options=model_options,
-        index=model_options.index(st.session_state.selected_model)
-    )
-    
-    # Enhanced job roles
-    job_role = st.selectbox(
-        "💼 Job Role:",
-        options=[
+    # Session State Initialization
+    if "job_role" not in st.session_state:
+        st.session_state.update({
+            "job_role": "Select",
+            "skill": "Aptitude",
+            "interview": InterviewState(None, 0),
+            "current_index": 0,
+            "num_questions": 10,
+            "ready_next": False,
+            "selected_model": "gemma2-9b-it",
+            "stage": "aptitude"
+        })
+
+    # Interviews are saved under a resume token kept in the page URL, so a
+    # refresh, a dropped connection or a server restart carries on where it left
+    # off instead of generating every question again
+    if "session_token" not in st.session_state:
+        token = st.query_params.get("session")
+        restored, prefetched = get_session_store().load(token) if token else (None, [])
+        if restored:
+            st.session_state.update(restored, prefetched_questions=prefetched)
+        st.session_state.session_token = token or new_token()
+        st.query_params["session"] = st.session_state.session_token
+
+    with st.sidebar:
+        st.header("🛠 Interview Configuration")
+
+        # Question range selector
+        st.session_state.num_questions = st.number_input(
+            "Number of Questions:",
+            min_value=1,
+            max_value=15,
+            value=st.session_state.num_questions,
+            step=1
+        )
+
+        # Ask for every question of the interview in a single model call
+        st.session_state.batch_generation = st.checkbox(
+            "⚡ Generate all questions in one call",
+            value=st.session_state.get("batch_generation", False)
+        )
+
+        # Show the first question token by token instead of waiting for it
+        st.session_state.stream_questions = st.checkbox(
+            "🌊 Stream questions as they are written",
+            value=st.session_state.get("stream_questions", False)
+        )
+
+        # Race a second model when the selected one is slow to answer
+        st.session_state.hedge_requests = st.checkbox(
+            "🏁 Hedge slow question requests",
+            value=st.session_state.get("hedge_requests", False)
+        )
+
+        # Collect every answer first and grade them together at the end
+        st.session_state.grade_at_end = st.checkbox(
+            "📝 Grade all answers at the end",
+            value=st.session_state.get("grade_at_end", False)
+        )
+
+        # Timings, tokens and failures of recent LLM calls on this server
+        st.session_state.show_debug = st.checkbox(
+            "🐞 Show LLM debug panel",
+            value=st.session_state.get("show_debug", False)
+        )
+
+        model_options = list(MODEL_CONFIG.keys())
+        st.session_state.selected_model = st.selectbox(
+            "🤖 AI Model:",
+            options=model_options,
+            index=model_options.index(st.session_state.selected_model)
+        )
+
+        # Enhanced job roles
+        job_roles = [
             "Select", 
             "Data Analyst", 
             "Machine Learning Engineer", 
@@ -424,279 +207,437 @@ with st.sidebar:
             "Cybersecurity Specialist", 
             "AI Researcher"
         ]
-    )
-    
-    stage = st.selectbox(
-        "Stage:",
-        options=["aptitude", "coding", "technical", "behavioral"]
-    )
-    
-    # Enhanced skill selection logic
-    skill = "Aptitude"
-    if stage == 'coding':
-        coding_skills = ["Python", "SQL", "DSA", "R", "Java", "C++", "JavaScript", "Go", "Kotlin", "Swift"]
-        skill = st.selectbox(
-            "📚 Coding Skill:",
-            options=["Select"] + coding_skills,
-            index=0 if st.session_state.skill not in coding_skills 
-                   else coding_skills.index(st.session_state.skill) + 1
-        )
-    elif stage != 'aptitude':
-        # Enhanced skills map for job roles
-        skills_map = {
-            "Data Analyst": ["Python", "SQL", "Excel", "Data Visualization", "Power BI", "Tableau"],
-            "Machine Learning Engineer": ["Python", "R", "SQL", "Machine Learning", "Deep Learning", "TensorFlow", "PyTorch"],
-            "Web Developer": ["HTML", "CSS", "JavaScript", "React", "Angular", "Node.js", "PHP"],
-            "Power BI Developer": ["Power BI", "DAX", "SQL", "Data Modeling", "Excel"],
-            "Data Scientist": ["Python", "R", "SQL", "Statistics", "Machine Learning", "Data Wrangling"],
-            "Frontend Developer": ["HTML", "CSS", "JavaScript", "React", "Vue.js", "TypeScript"],
-            "Backend Developer": ["Python", "Java", "C#", "Node.js", "Ruby", "Go", "SQL"],
-            "Fullstack Developer": ["HTML", "CSS", "JavaScript", "React", "Node.js", "Python", "SQL"],
-            "DevOps Engineer": ["Docker", "Kubernetes", "AWS", "Azure", "CI/CD", "Linux", "Terraform"],
-            "Cloud Engineer": ["AWS", "Azure", "Google Cloud", "Kubernetes", "Terraform", "Python"],
-            "Mobile App Developer": ["Kotlin", "Swift", "Java", "Flutter", "React Native"],
-            "Game Developer": ["C++", "C#", "Unity", "Unreal Engine", "Game Physics"],
-            "Cybersecurity Specialist": ["Network Security", "Penetration Testing", "Python", "Cryptography", "SIEM"],
-            "AI Researcher": ["Python", "TensorFlow", "PyTorch", "NLP", "Computer Vision", "Reinforcement Learning"]
-        }
-        skills = ["Select"] + skills_map.get(job_role, [])
-        skill = st.selectbox(
-            "📚 Skill:",
-            options=skills,
-            index=0 if st.session_state.skill not in skills 
-                   else skills.index(st.session_state.skill)
+        job_role = st.selectbox(
+            "💼 Job Role:",
+            options=job_roles,
+            index=job_roles.index(st.session_state.job_role) if st.session_state.job_role in job_roles else 0
         )
 
-    # Reset session on config change
-    current_config = (st.session_state.selected_model, job_role, skill, 
-                     st.session_state.num_questions, stage)
-    if current_config != st.session_state.prev_config:
-        st.session_state.update({
-            "questions": [],
-            "current_index": 0,
-            "answers": [''] * st.session_state.num_questions,
-            "evaluations": [{} for _ in range(st.session_state.num_questions)],
-            "rubric_totals": [0] * st.session_state.num_questions,
-            "binary_scores": [0] * st.session_state.num_questions,
-            "ready_next": False,
-            "prev_config": current_config,
-            "skill": skill,
-            "stage": stage
-        })
+        stages = ["aptitude", "coding", "technical", "behavioral"]
+        stage = st.selectbox(
+            "Stage:",
+            options=stages,
+            index=stages.index(st.session_state.stage)
+        )
 
-st.title("🧑‍💻Technical Interview AIAgents🤖")
-st.caption("🚀 AI-Powered Interview Trainer: Your Smart Hiring Assistant 🤖")
-
-if st.session_state.skill != "Select" or st.session_state.stage == 'aptitude':
-
-    # default difficulty in case it's the first question
-    difficulty = "Medium"
-
-    col1, col2 = st.columns([4, 1])
-    with col1:
-        st.subheader(f"Question {st.session_state.current_index + 1} of {st.session_state.num_questions}")
-    with col2:
-        st.caption(f"Model: {st.session_state.selected_model.split('-')[0]}")
-
-    # Adjust question difficulty based on performance
-    if st.session_state["current_index"] > 0:
-        last_score = st.session_state.binary_scores[st.session_state["current_index"] - 1]
-        if last_score == 1:
-            difficulty = "Hard" if difficulty == "Medium" else "Medium"
-        else:
-            difficulty = "Easy" if difficulty == "Medium" else "Medium"
-
-    # Question generation
-    if len(st.session_state.questions) < st.session_state.num_questions:
-        while len(st.session_state.questions) <= st.session_state.current_index:
-            new_q = generate_question(
-                st.session_state.job_role,
-                st.session_state.skill if st.session_state.stage != 'aptitude' else "Aptitude",
-                st.session_state.selected_model,
-                st.session_state.questions,
-                st.session_state.stage,
-                difficulty
+        # Enhanced skill selection logic
+        skill = "Aptitude"
+        if stage == 'coding':
+            coding_skills = ["Python", "SQL", "DSA", "R", "Java", "C++", "JavaScript", "Go", "Kotlin", "Swift"]
+            skill = st.selectbox(
+                "📚 Coding Skill:",
+                options=["Select"] + coding_skills,
+                index=0 if st.session_state.skill not in coding_skills 
+                       else coding_skills.index(st.session_state.skill) + 1
+            )
+        elif stage != 'aptitude':
+            # Enhanced skills map for job roles
+            skills_map = {
+                "Data Analyst": ["Python", "SQL", "Excel", "Data Visualization", "Power BI", "Tableau"],
+                "Machine Learning Engineer": ["Python", "R", "SQL", "Machine Learning", "Deep Learning", "TensorFlow", "PyTorch"],
+                "Web Developer": ["HTML", "CSS", "JavaScript", "React", "Angular", "Node.js", "PHP"],
+                "Power BI Developer": ["Power BI", "DAX", "SQL", "Data Modeling", "Excel"],
+                "Data Scientist": ["Python", "R", "SQL", "Statistics", "Machine Learning", "Data Wrangling"],
+                "Frontend Developer": ["HTML", "CSS", "JavaScript", "React", "Vue.js", "TypeScript"],
+                "Backend Developer": ["Python", "Java", "C#", "Node.js", "Ruby", "Go", "SQL"],
+                "Fullstack Developer": ["HTML", "CSS", "JavaScript", "React", "Node.js", "Python", "SQL"],
+                "DevOps Engineer": ["Docker", "Kubernetes", "AWS", "Azure", "CI/CD", "Linux", "Terraform"],
+                "Cloud Engineer": ["AWS", "Azure", "Google Cloud", "Kubernetes", "Terraform", "Python"],
+                "Mobile App Developer": ["Kotlin", "Swift", "Java", "Flutter", "React Native"],
+                "Game Developer": ["C++", "C#", "Unity", "Unreal Engine", "Game Physics"],
+                "Cybersecurity Specialist": ["Network Security", "Penetration Testing", "Python", "Cryptography", "SIEM"],
+                "AI Researcher": ["Python", "TensorFlow", "PyTorch", "NLP", "Computer Vision", "Reinforcement Learning"]
+            }
+            skills = ["Select"] + skills_map.get(job_role, [])
+            skill = st.selectbox(
+                "📚 Skill:",
+                options=skills,
+                index=0 if st.session_state.skill not in skills 
+                       else skills.index(st.session_state.skill)
             )
-            st.session_state.questions.append(new_q)
-
-    # Navigation columns
-    col1, col2, col3 = st.columns([1, 2, 1])
-
-    with col1:
-        if st.session_state["current_index"] > 0:
-            if st.button("⬅️ Previous Question"):
-                st.session_state["current_index"] -= 1
-                st.session_state.ready_next = False
-                st.rerun()  # updated to st.rerun
-
-    with col3:
-        if st.session_state["current_index"] < st.session_state.num_questions - 1:
-            if st.button("➡️ Next Question"):
-                st.session_state["current_index"] += 1
-                st.session_state.ready_next = False
-                st.rerun()  # updated to st.rerun
-
-    # Display current question
-    current_q = st.session_state.questions[st.session_state["current_index"]]
-    st.markdown(f"<h3 style='font-size: 24px;'>{current_q}</h3>", unsafe_allow_html=True)
-
-    # Answer input
-    answer = st.text_area(
-        "Your Answer:",
-        value=st.session_state.answers[st.session_state["current_index"]],
-        height=150,
-        key=f"ans_{st.session_state['current_index']}"
-    )
 
-    # Submit button
-    if not st.session_state.ready_next:
-        if st.button("Submit Answer"):
-            if answer.strip():
-                evaluation = evaluate_answer(current_q, answer.strip(), st.session_state.selected_model)
-                st.session_state.answers[st.session_state["current_index"]] = answer.strip()
-                st.session_state.evaluations[st.session_state["current_index"]] = evaluation
-                st.session_state.rubric_totals[st.session_state["current_index"]] = evaluation["total_score"]
-                st.session_state.binary_scores[st.session_state["current_index"]] = evaluation["binary_score"]
-                st.session_state.ready_next = True
-                st.rerun()  # updated to st.rerun
-
-
-    # Show Hint button
-    if st.button("Show Hint"):
-        hint = get_hint(current_q)
-        st.info(f"Hint: {hint}")
-
-    if st.session_state.ready_next:
-        # Calculate cumulative scores
-        total_rubric = sum(st.session_state.rubric_totals)
-        total_binary = sum(st.session_state.binary_scores)
-        max_rubric = (st.session_state.current_index + 1) * 12
-        
-        st.progress((st.session_state.current_index + 1) / st.session_state.num_questions)
-        st.subheader(f"Rubric Score: {total_rubric}/{max_rubric}")
-        st.subheader(f"Passed Questions: {total_binary}/{st.session_state.current_index + 1}")
-        
-        # Award badges based on scores
-        if total_rubric >= 30:
-            st.markdown("🏅 **Badge Earned: Coding Pro**")
-        elif total_rubric >= 20:
-            st.markdown("🎖️ **Badge Earned: Aptitude Master**")
-        else:
-            st.markdown("🎗️ **Badge Earned: Beginner**")
-        
-        # Display detailed feedback
-        eval_data = st.session_state.evaluations[st.session_state.current_index]
-        with st.expander("Detailed Feedback"):
-            # Display Pass/Fail status
-            if eval_data.get("binary_score", 0) == 1:
-                st.success("✅ **Status: Pass**")
-            else:
-                st.error("❌ **Status: Fail**")
+        # The page link carries this token; reopening it resumes the interview
+        st.caption(f"🔖 Resume code: {st.session_state.session_token}")
+
+        profile.checkpoint("sidebar")
+
+        # Reset session on config change
+        current_config = (st.session_state.selected_model, job_role, skill, 
+                         st.session_state.num_questions, stage)
+        if current_config != st.session_state.interview.config:
+            if "prefetcher" in st.session_state:
+                st.session_state.prefetcher.shutdown()
+                st.session_state.evaluator.shutdown()
+            st.session_state.update({
+                "interview": InterviewState(current_config, st.session_state.num_questions),
+                "current_index": 0,
+                "ready_next": False,
+                "job_role": job_role,
+                "skill": skill,
+                "stage": stage,
+                **start_workers(stage)
+            })
+        elif "prefetcher" not in st.session_state:
+            # Resumed interview: only the workers are new. Answers still waiting
+            # for a grade are resubmitted; most are already in the evaluation cache
+            st.session_state.update(start_workers(st.session_state.stage))
+            st.session_state.prefetcher.restore(st.session_state.pop("prefetched_questions", []))
+            if not st.session_state.grade_at_end:
+                interview = st.session_state.interview
+                for index, saved_answer in enumerate(interview.answers):
+                    if saved_answer and not interview.is_graded(index):
+                        st.session_state.evaluator.submit(
+                            index, interview.questions[index], saved_answer, st.session_state.selected_model
+                        )
+        profile.checkpoint("config_reset")
+
+
+    interview = st.session_state.interview
+
+    # Fold in any answers graded in the background since the last rerun
+    for index, evaluation in st.session_state.evaluator.collect():
+        interview.store_evaluation(index, evaluation)
+
+
+    @st.fragment(run_every=1)
+    def await_evaluations():
+        # Polls without rerunning the page until a background evaluation lands
+        if st.session_state.evaluator.has_results():
+            st.rerun()
+
+    st.title("🧑‍💻Technical Interview AIAgents🤖")
+    st.caption("🚀 AI-Powered Interview Trainer: Your Smart Hiring Assistant 🤖")
+
+    if st.session_state.skill != "Select" or st.session_state.stage == 'aptitude':
+
+        col1, col2 = st.columns([4, 1])
+        with col1:
+            st.subheader(f"Question {st.session_state.current_index + 1} of {st.session_state.num_questions}")
+        with col2:
+            st.caption(f"Model: {st.session_state.selected_model.split('-')[0]}")
+
+        # Adjust question difficulty based on performance: Hard after a passed
+        # answer, Easy after a failed one, Medium for the first question. Nothing
+        # is graded before the end in grade-at-end mode, so it stays at Medium
+        def slot_difficulty(index):
+            if index == 0 or st.session_state.grade_at_end:
+                return "Medium"
+            return "Hard" if interview.passed(index - 1) else "Easy"
+
+        # Question generation: serve from the prefetch queue and keep it topped up
+        prefetcher = st.session_state.prefetcher
+        generation_args = {
+            "role": st.session_state.job_role,
+            "skill": st.session_state.skill if st.session_state.stage != 'aptitude' else "Aptitude",
+            "model_name": st.session_state.selected_model,
+            "stage": st.session_state.stage,
+            "hedge_after": HEDGE_AFTER_SECONDS if st.session_state.hedge_requests else None
+        }
+        if (st.session_state.batch_generation and not interview.questions
+                and not prefetcher.pending()):
+            with st.spinner("Generating interview questions..."):
+                interview.questions.extend(generate_questions_batch(
+                    existing_questions=[], count=st.session_state.num_questions,
+                    difficulty=slot_difficulty(0), **generation_args
+                ))
+        if len(interview.questions) < st.session_state.num_questions:
+            while len(interview.questions) <= st.session_state.current_index:
+                slot = len(interview.questions)
+                # A new question waits for the previous answer's grade, which is
+                # usually still running when the candidate moves on; an ungraded
+                # answer would count as a fail
+                if slot > 0 and st.session_state.evaluator.is_pending(slot - 1):
+                    with st.spinner("Grading your last answer..."):
+                        st.session_state.evaluator.wait(slot - 1)
+                    for index, evaluation in st.session_state.evaluator.collect():
+                        interview.store_evaluation(index, evaluation)
+                difficulty = slot_difficulty(slot)
+                if st.session_state.stream_questions and not prefetcher.has(slot, difficulty):
+                    placeholder = st.empty()
+                    new_q = stream_question(
+                        existing_questions=interview.questions,
+                        on_token=lambda text: placeholder.markdown(
+                            f"<h3 style='font-size: 24px;'>{text}</h3>", unsafe_allow_html=True
+                        ),
+                        difficulty=difficulty,
+                        **generation_args
+                    )
+                    placeholder.empty()
+                else:
+                    with st.spinner("Generating question..."):
+                        new_q = prefetcher.take(slot, difficulty=difficulty, **generation_args)
+                interview.questions.append(new_q)
+            # Upcoming questions whose deciding grade is known are queued at
+            # their difficulty. The first one still waiting for a grade is
+            # queued at both Hard and Easy, and nothing after it is known yet
+            plan = {}
+            for slot in range(len(interview.questions),
+                              min(st.session_state.current_index + 1 + prefetcher.depth, st.session_state.num_questions)):
+                if slot > 0 and not interview.is_graded(slot - 1) and not st.session_state.grade_at_end:
+                    plan[slot] = ("Hard", "Easy")
+                    break
+                plan[slot] = (slot_difficulty(slot),)
+            prefetcher.fill(interview.questions, plan, **generation_args)
+
+        # Saved after every generation and navigation; unchanged state is not rewritten
+        get_session_store().save(st.session_state.session_token, st.session_state, prefetcher.prefetched())
+        profile.checkpoint("generation")
+
+        # Navigation columns
+        col1, col2, col3 = st.columns([1, 2, 1])
+
+        with col1:
+            if st.session_state["current_index"] > 0:
+                if st.button("⬅️ Previous Question"):
+                    st.session_state["current_index"] -= 1
+                    st.session_state.ready_next = False
+                    st.rerun()  # updated to st.rerun
+
+        with col3:
+            if st.session_state["current_index"] < st.session_state.num_questions - 1:
+                if st.button("➡️ Next Question"):
+                    st.session_state["current_index"] += 1
+                    st.session_state.ready_next = False
+                    st.rerun()  # updated to st.rerun
+
+        # Display current question
+        current_q = interview.questions[st.session_state["current_index"]]
+        st.markdown(f"<h3 style='font-size: 24px;'>{current_q}</h3>", unsafe_allow_html=True)
+
+        # Answer input
+        answer = st.text_area(
+            "Your Answer:",
+            value=interview.answers[st.session_state["current_index"]],
+            height=150,
+            key=f"ans_{st.session_state['current_index']}"
+        )
 
-            # Display feedback if available
-            if "feedback" in eval_data:
-                st.markdown("### Feedback:")
-                st.markdown(eval_data["feedback"])
+        # Submit button
+        if not st.session_state.ready_next:
+            if st.button("Submit Answer"):
+                if answer.strip():
+                    index = st.session_state["current_index"]
+                    interview.answers[index] = answer.strip()
+                    cached = get_evaluation_cache().get(
+                        evaluation_key(current_q, answer.strip(), st.session_state.selected_model)
+                    )
+                    if cached is not None:
+                        interview.store_evaluation(index, cached)
+                    elif st.session_state.grade_at_end:
+                        interview.clear_evaluation(index)
+                    else:
+                        # Grade in the background so the candidate can move on right away
+                        interview.clear_evaluation(index)
+                        st.session_state.evaluator.submit(
+                            index, current_q, answer.strip(), st.session_state.selected_model
+                        )
+                    st.session_state.ready_next = True
+                    get_session_store().save(
+                        st.session_state.session_token, st.session_state, prefetcher.prefetched()
+                    )
+                    st.rerun()  # updated to st.rerun
+
+
+        # Show Hint button
+        if st.button("Show Hint"):
+            hint = get_hint(current_q)
+            st.info(f"Hint: {hint}")
+
+        if st.session_state.ready_next:
+            # Calculate cumulative scores
+            total_rubric = interview.rubric_total()
+            total_binary = interview.passed_count()
+            max_rubric = (st.session_state.current_index + 1) * 12
+
+            st.progress((st.session_state.current_index + 1) / st.session_state.num_questions)
+            st.subheader(f"Rubric Score: {total_rubric}/{max_rubric}")
+            st.subheader(f"Passed Questions: {total_binary}/{st.session_state.current_index + 1}")
+
+            # Award badges based on scores
+            if total_rubric >= 30:
+                st.markdown("🏅 **Badge Earned: Coding Pro**")
+            elif total_rubric >= 20:
+                st.markdown("🎖️ **Badge Earned: Aptitude Master**")
             else:
-                st.warning("No feedback available for this question.")
-
-            # Display strengths
-            st.markdown("### Strengths:")
-            strengths = eval_data.get("strengths", [])
-            if strengths:
-                for strength in strengths:
-                    st.markdown(f"- {strength}")
+                st.markdown("🎗️ **Badge Earned: Beginner**")
+
+            # Display detailed feedback
+            eval_data = interview.evaluation(st.session_state.current_index)
+            with st.expander("Detailed Feedback"):
+                if st.session_state.evaluator.is_pending(st.session_state.current_index):
+                    st.info("⏳ Evaluating your answer... feedback will appear here shortly.")
+                elif not eval_data and st.session_state.grade_at_end:
+                    st.info("📝 This answer will be graded at the end of the interview.")
+                else:
+                    # Display Pass/Fail status
+                    if eval_data.get("binary_score", 0) == 1:
+                        st.success("✅ **Status: Pass**")
+                    else:
+                        st.error("❌ **Status: Fail**")
+                    if eval_data.get("prescored"):
+                        st.caption("Scored instantly: the answer was empty, too short or only repeated the question.")
+
+                    # Display feedback if available
+                    if "feedback" in eval_data:
+                        st.markdown("### Feedback:")
+                        st.markdown(eval_data["feedback"])
+                    else:
+                        st.warning("No feedback available for this question.")
+
+                    # Display strengths
+                    st.markdown("### Strengths:")
+                    strengths = eval_data.get("strengths", [])
+                    if strengths:
+                        for strength in strengths:
+                            st.markdown(f"- {strength}")
+                    else:
+                        st.info("No strengths identified.")
+
+                    # Display suggestions
+                    st.markdown("### Suggestions:")
+                    suggestions = eval_data.get("suggestions", [])
+                    if suggestions:
+                        for suggestion in suggestions:
+                            st.markdown(f"- {suggestion}")
+                    else:
+                        st.info("No suggestions provided.")
+
+            if st.session_state.current_index < st.session_state.num_questions - 1:
+                if st.button("Next Question ➡️"):
+                    st.session_state.current_index += 1
+                    st.session_state.ready_next = False
+                    st.rerun()
+            elif ungraded := [
+                i for i, a in enumerate(interview.answers)
+                if a and not interview.is_graded(i) and not st.session_state.evaluator.is_pending(i)
+            ]:
+                if st.button(f"📊 Grade All Answers ({len(ungraded)})"):
+                    with st.spinner(f"Grading {len(ungraded)} answers..."):
+                        results = evaluate_answers_batch(
+                            [(interview.questions[i], interview.answers[i]) for i in ungraded],
+                            st.session_state.selected_model,
+                            stage=st.session_state.stage
+                        )
+                    for index, evaluation in zip(ungraded, results):
+                        interview.store_evaluation(index, evaluation)
+                    st.rerun()
+            elif st.session_state.evaluator.pending():
+                st.info(f"⏳ Waiting for {st.session_state.evaluator.pending()} evaluation(s) to finish...")
             else:
-                st.info("No strengths identified.")
-
-            # Display suggestions
-            st.markdown("### Suggestions:")
-            suggestions = eval_data.get("suggestions", [])
-            if suggestions:
-                for suggestion in suggestions:
-                    st.markdown(f"- {suggestion}")
-            else:
-                st.info("No suggestions provided.")
-
-        if st.session_state.current_index < st.session_state.num_questions - 1:
-            if st.button("Next Question ➡️"):
-                st.session_state.current_index += 1
-                st.session_state.ready_next = False
-                st.rerun()
-        else:
-            st.success("🎉 Interview Complete!")
-            report_content = f"Final Scores:\nRubric: {total_rubric}/{(st.session_state.num_questions)*12}"
-            report_content += f"\nPassed Questions: {total_binary}/{st.session_state.num_questions}\n\n"
-            
-            for i, (q, a, e) in enumerate(zip(st.session_state.questions, 
-                                            st.session_state.answers,
-                                            st.session_state.evaluations)):
-                report_content += f"Question {i+1}:\n{q}\n\nAnswer:\n{a}\n\n"
-                report_content += f"Correctness: {e['rubric_scores']['correctness']}/4\n"
-                report_content += f"Depth: {e['rubric_scores']['depth']}/4\n"
-
-# Initialize session state variables if not already set
-if "timer" not in st.session_state:
-    st.session_state["timer"] = 60  # Default timer value in seconds
-if "timer_running" not in st.session_state:
-    st.session_state["timer_running"] = True  # Timer starts in running state
-if "last_update_time" not in st.session_state:
-    st.session_state["last_update_time"] = time.time()  # Track the last update time
-
-# Timer controls
-col1, col2, col3 = st.columns([1, 1, 1])
-with col1:
-    if st.button("⏸ Pause Timer"):
-        st.session_state["timer_running"] = False
-with col2:
-    if st.button("▶️ Resume Timer"):
-        st.session_state["timer_running"] = True
-with col3:
-    if st.button("🔄 Reset Timer"):
-        st.session_state["timer"] = 60  # Reset to default or custom value
+                st.success("🎉 Interview Complete!")
+                report_content = f"Final Scores:\nRubric: {total_rubric}/{(st.session_state.num_questions)*12}"
+                report_content += f"\nPassed Questions: {total_binary}/{st.session_state.num_questions}\n\n"
+
+                for i, (q, a) in enumerate(zip(interview.questions, interview.answers)):
+                    e = interview.evaluation(i)
+                    report_content += f"Question {i+1}:\n{q}\n\nAnswer:\n{a}\n\n"
+                    report_content += f"Correctness: {e['rubric_scores']['correctness']}/4\n"
+                    report_content += f"Depth: {e['rubric_scores']['depth']}/4\n"
+
+    if st.session_state.evaluator.pending():
+        await_evaluations()
+    profile.checkpoint("answer_area")
+
+    # Initialize session state variables if not already set
+    if "timer" not in st.session_state:
+        st.session_state["timer"] = st.session_state["timer_total"]
+    if "timer_running" not in st.session_state:
+        st.session_state["timer_running"] = True  # Timer starts in running state
+    if "last_update_time" not in st.session_state:
+        st.session_state["last_update_time"] = time.time()  # Track the last update time
+
+    # Restart the countdown for a new question or a new difficulty
+    timer_key = (st.session_state["current_index"], st.session_state["timer_total"])
+    if st.session_state.get("timer_key") != timer_key:
+        st.session_state["timer_key"] = timer_key
+        st.session_state["timer"] = st.session_state["timer_total"]
         st.session_state["last_update_time"] = time.time()
 
-# Update the timer based on elapsed time
-if st.session_state["timer_running"]:
-    current_time = time.time()
-    elapsed_time = current_time - st.session_state["last_update_time"]
-    st.session_state["last_update_time"] = current_time
-
-    if st.session_state["timer"] > 0:
-        st.session_state["timer"] -= elapsed_time  # Decrement the timer
-        st.session_state["timer"] = max(0, st.session_state["timer"])  # Ensure timer doesn't go below 0
-        
-
-# Display the countdown timer with a progress bar
-total_time = 60  # Total time for the timer
-remaining_time = int(st.session_state["timer"])
-progress = min(remaining_time / total_time, 1.0)  # Ensure progress is within [0.0, 1.0]
-
-st.markdown(f"<h3 style='text-align: center;'>⏳ Time Remaining: {remaining_time} seconds</h3>", unsafe_allow_html=True)
-st.progress(progress)
-
-# Handle timer expiration
-if remaining_time <= 0:
-    st.warning("⏰ Time's up! Moving to the next question...")
-    if st.session_state["current_index"] < st.session_state["num_questions"] - 1:
-        st.session_state["current_index"] += 1  # Move to the next question
-        st.session_state["timer"] = 60  # Reset the timer for the next question
-        st.rerun()
-  # Rerun the app to load the next question
-    else:
-        st.success("🎉 Interview Complete!")
-
-# Calculate progress
-progress_percentage = (st.session_state.current_index + 1) / st.session_state.num_questions * 100
-
-# Create a radial progress chart
-fig = px.pie(
-    values=[progress_percentage, 100 - progress_percentage],
-    names=["Completed", "Remaining"],
-    title="Progress",
-    hole=0.4,  # Donut chart style
-    color_discrete_sequence=["#00cc96", "#636efa"]
-)
 
-# Display the progress chart
-st.plotly_chart(fig, use_container_width=True)
+    @st.fragment(run_every=1)
+    def countdown_timer():
+        # Ticks once a second on its own; only time-up reruns the whole page
+        col1, col2, col3 = st.columns([1, 1, 1])
+        with col1:
+            if st.button("⏸ Pause Timer"):
+                st.session_state["timer_running"] = False
+        with col2:
+            if st.button("▶️ Resume Timer"):
+                st.session_state["timer_running"] = True
+        with col3:
+            if st.button("🔄 Reset Timer"):
+                st.session_state["timer"] = st.session_state["timer_total"]
+
+        # Update the timer based on elapsed time; time spent paused is not counted
+        current_time = time.time()
+        elapsed_time = current_time - st.session_state["last_update_time"]
+        st.session_state["last_update_time"] = current_time
+        if st.session_state["timer_running"]:
+            st.session_state["timer"] = max(0, st.session_state["timer"] - elapsed_time)
+
+        # Display the countdown timer with a progress bar
+        total_time = st.session_state["timer_total"]
+        remaining_time = int(st.session_state["timer"])
+        progress = min(remaining_time / total_time, 1.0)  # Ensure progress is within [0.0, 1.0]
+
+        st.markdown(f"<h3 style='text-align: center;'>⏳ Time Remaining: {remaining_time} seconds</h3>", unsafe_allow_html=True)
+        st.progress(progress)
+
+        # Handle timer expiration
+        if remaining_time <= 0:
+            st.warning("⏰ Time's up! Moving to the next question...")
+            if st.session_state["current_index"] < st.session_state["num_questions"] - 1:
+                st.session_state["current_index"] += 1  # Move to the next question
+                st.session_state.ready_next = False
+                st.rerun()  # Rerun the app to load the next question
+            else:
+                st.success("🎉 Interview Complete!")
+
+    countdown_timer()
+    profile.checkpoint("timer")
+
+
+    @st.cache_data
+    def progress_figure(progress_percentage):
+        # Create a radial progress chart; graph_objects is imported here because it
+        # is far cheaper to load than plotly.express and only this chart needs it
+        import plotly.graph_objects as go
+
+        fig = go.Figure(go.Pie(
+            values=[progress_percentage, 100 - progress_percentage],
+            labels=["Completed", "Remaining"],
+            hole=0.4,  # Donut chart style
+            marker={"colors": ["#00cc96", "#636efa"]},
+            sort=False
+        ))
+        fig.update_layout(title="Progress")
+        return fig.to_dict()
+
+
+    @st.fragment
+    def progress_chart(progress_percentage):
+        # Only redrawn when the question changes, never by the timer
+        st.plotly_chart(progress_figure(progress_percentage), use_container_width=True)
+
+    # Calculate progress
+    progress_chart((st.session_state.current_index + 1) / st.session_state.num_questions * 100)
+    profile.checkpoint("chart")
+
+    # LLM debug panel, drawn last so it includes the calls made during this run
+    if st.session_state.show_debug:
+        telemetry = get_telemetry()
+        with st.sidebar.expander("🐞 LLM Calls", expanded=True):
+            st.caption("Recent calls on this server, by model, stage and operation")
+            st.dataframe(telemetry.summary(), hide_index=True)
+            st.dataframe(telemetry.recent_calls(20), hide_index=True)
+            st.download_button("Download JSONL", telemetry.jsonl(), file_name="llm_calls.jsonl")
+            st.download_button("Download Metrics", telemetry.prometheus(), file_name="llm_metrics.prom")
+            st.caption(f"Interview state of this session: {interview.memory_bytes() / 1024:.1f} KiB")
+            if profile.enabled:
+                st.caption("Script sections per rerun on this server (APP_PROFILE)")
+                st.dataframe(profile.stats.summary(), hide_index=True)
+                if profile.path:
+                    st.caption(f"cProfile for this session: {profile.path}")
+        profile.checkpoint("debug_panel")
+finally:
+    profile.finish()
@@ -0,0 +1,43 @@
+import io
+import os
+
+import streamlit as st
+
+# Sidebar images are shrunk to the size they are displayed at and re-encoded
+# once per process (and once per source file on disk) instead of sending the
+# multi-megabyte originals on every page load. JPEG rather than WebP, because
+# st.image re-encodes anything that is not PNG or JPEG on every run.
+# st.image serves the bytes from /media/<content hash>, so the URL only
+# changes when the image does; Streamlit sends no long-lived Cache-Control
+# for that route, so set one on the proxy in front of it, e.g. for nginx:
+#     location /media/ { proxy_pass ...; add_header Cache-Control "public, max-age=31536000, immutable"; }
+ASSET_CACHE_DIR = os.environ.get("ASSET_CACHE_DIR", os.path.join(".cache", "assets"))
+SIDEBAR_IMAGE_WIDTH = 600  # Twice the sidebar's CSS width, for high-DPI screens
+ASSET_QUALITY = 80
+
+
+@st.cache_resource(show_spinner=False)
+def sidebar_image(path, width=SIDEBAR_IMAGE_WIDTH):
+    # Raises FileNotFoundError for a missing image, like st.image(path) does
+    stat = os.stat(path)
+    name = os.path.splitext(os.path.basename(path))[0]
+    cached_path = os.path.join(ASSET_CACHE_DIR, f"{name}-{width}-{stat.st_size}-{int(stat.st_mtime)}.jpg")
+    if os.path.exists(cached_path):
+        with open(cached_path, "rb") as f:
+            return f.read()
+
+    from PIL import Image  # Only needed the first time an image is built
+
+    with Image.open(path) as image:
+        image.thumbnail((width, width * 4))
+        buffer = io.BytesIO()
+        image.convert("RGB").save(buffer, format="JPEG", quality=ASSET_QUALITY, optimize=True, progressive=True)
+    data = buffer.getvalue()
+    try:
+        os.makedirs(ASSET_CACHE_DIR, exist_ok=True)
+        with open(cached_path + ".tmp", "wb") as f:
+            f.write(data)
+        os.replace(cached_path + ".tmp", cached_path)
+    except OSError:
+        pass  # The in-process cache still avoids rebuilding it
+    return data
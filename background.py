@@ -0,0 +1,133 @@
+import asyncio
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from concurrent.futures import wait as wait_futures
+
+_loop = None
+_loop_lock = threading.Lock()
+
+
+def run_async(coro):
+    # Every async LLM call in the process runs on one long-lived event loop,
+    # so pooled async HTTP connections are never bound to a closed loop
+    global _loop
+    with _loop_lock:
+        if _loop is None:
+            _loop = asyncio.new_event_loop()
+            threading.Thread(target=_loop.run_forever, name="llm-event-loop", daemon=True).start()
+    return asyncio.run_coroutine_threadsafe(coro, _loop).result()
+
+
+class QuestionPrefetcher:
+    """Keeps the next few interview questions generating in a background thread."""
+
+    def __init__(self, generate_fn, depth=2):
+        self.depth = depth
+        self._generate_fn = generate_fn
+        # A single worker keeps generation sequential, so every new question
+        # is de-duplicated against the ones prefetched before it
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="question-prefetch")
+        self._lock = threading.Lock()
+        self._pending = {}  # (slot, difficulty) -> future, in the order they were scheduled
+        self._history = []
+
+    def _run(self, kwargs):
+        with self._lock:
+            existing = list(self._history)
+        question = self._generate_fn(existing_questions=existing, **kwargs)
+        with self._lock:
+            self._history.append(question)
+        return question
+
+    def _drop(self, keys):
+        # A generation already running cannot be cancelled; its question is
+        # simply never served
+        for key in keys:
+            self._pending.pop(key).cancel()
+
+    def pending(self):
+        return len(self._pending)
+
+    def has(self, slot, difficulty):
+        return (slot, difficulty) in self._pending
+
+    def fill(self, questions, plan, **kwargs):
+        # `questions` are the ones already shown to the candidate; `plan` maps
+        # each upcoming slot to the difficulties it may be asked at. Queued
+        # work outside the plan is dropped and the rest of it is queued
+        with self._lock:
+            known = set(self._history)
+            self._history.extend(q for q in questions if q not in known)
+        wanted = [(slot, difficulty) for slot, difficulties in plan.items() for difficulty in difficulties]
+        self._drop([key for key in self._pending if key not in wanted])
+        for slot, difficulty in wanted:
+            if (slot, difficulty) not in self._pending:
+                self._pending[slot, difficulty] = self._executor.submit(
+                    self._run, {**kwargs, "difficulty": difficulty}
+                )
+
+    def take(self, slot, **kwargs):
+        # Serve the question prefetched for `slot` at the requested difficulty,
+        # or have the worker generate it next (e.g. on the very first question).
+        # Other prefetches for this and earlier slots are stale from now on
+        future = self._pending.pop((slot, kwargs["difficulty"]), None)
+        self._drop([key for key in self._pending if key[0] <= slot])
+        if future is None:
+            future = self._executor.submit(self._run, kwargs)
+        return future.result()
+
+    def prefetched(self):
+        # [question, slot, difficulty] for every question generated but not
+        # served yet, so they can be saved with the interview
+        return [
+            [future.result(), slot, difficulty] for (slot, difficulty), future in list(self._pending.items())
+            if future.done() and not future.cancelled() and not future.exception()
+        ]
+
+    def restore(self, prefetched):
+        # Queues questions saved by prefetched() as if just generated
+        for question, slot, difficulty in prefetched:
+            future = Future()
+            future.set_result(question)
+            self._pending[slot, difficulty] = future
+            with self._lock:
+                self._history.append(question)
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
+        self._pending.clear()
+
+
+class BackgroundEvaluator:
+    """Grades submitted answers off the script thread, keyed by question index."""
+
+    def __init__(self, evaluate_fn, max_workers=2):
+        self._evaluate_fn = evaluate_fn
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="answer-eval")
+        self._pending = {}
+
+    def submit(self, index, question, answer, model_name):
+        # A resubmission replaces any evaluation still running for that index
+        self._pending[index] = self._executor.submit(self._evaluate_fn, question, answer, model_name)
+
+    def is_pending(self, index):
+        return index in self._pending
+
+    def pending(self):
+        return len(self._pending)
+
+    def wait(self, index):
+        # Blocks until the evaluation of `index`, if one is running, has finished
+        if index in self._pending:
+            wait_futures([self._pending[index]])
+
+    def has_results(self):
+        return any(future.done() for future in self._pending.values())
+
+    def collect(self):
+        finished = [index for index, future in self._pending.items() if future.done()]
+        return [(index, self._pending.pop(index).result()) for index in finished]
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
+        self._pending.clear()
@@ -0,0 +1,135 @@
+"""Offline latency benchmark for generate_question() and evaluate_answer().
+
+Runs the app's own generation and evaluation code against the fake chat model
+from fake_llm.py, so no network or API key is needed. It reports throughput,
+p50/p95 latency, retries and failures per stage prompt, the cost of the
+output post-processing (post us: mean time per parse/check call) and how
+often output parsed cleanly, needed repair or a follow-up, or failed.
+
+Every call sends a distinct prompt (the skill is numbered per iteration for
+generation, the answer for evaluation), so concurrent calls are never merged
+by the single-flight layer or served from the evaluation cache and every
+iteration is one real model round trip.
+
+    python benchmarks/llm_latency.py --iterations 50 --latency 0.05 --failure-rate 0.1
+"""
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from util import percentile  # noqa: E402
+
+
+def report(name, latencies, wall, retries=0, failures=0, post=None):
+    post_us = f"{statistics.mean(post) * 1e6:>9.1f}" if post else f"{'-':>9}"
+    print(f"{name:<22} {len(latencies) / wall:>8.1f} {percentile(latencies, 0.5) * 1000:>9.1f} "
+          f"{percentile(latencies, 0.95) * 1000:>9.1f} {retries:>8} {failures:>8} {post_us}")
+
+
+def timed_calls(fn, samples):
+    # Wraps a post-processing step so its time is recorded into `samples`
+    def wrapper(*args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            samples.append(time.perf_counter() - start)
+    return wrapper
+
+
+def run_concurrently(fn, count, concurrency):
+    latencies = []
+
+    def timed(i):
+        start = time.perf_counter()
+        result = fn(i)
+        latencies.append(time.perf_counter() - start)
+        return result
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        results = list(executor.map(timed, range(count)))
+    return results, latencies, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--iterations", type=int, default=50, help="Calls per stage and for evaluation")
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--model", default="gemma2-9b-it")
+    parser.add_argument("--latency", type=float, default=0.05, help="Fake model latency in seconds")
+    parser.add_argument("--jitter", type=float, default=0.02)
+    parser.add_argument("--failure-rate", type=float, default=0.0)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    # Configure the offline backend and throwaway caches before the app modules load
+    cache_dir = tempfile.mkdtemp(prefix="llm-bench-")
+    os.environ.update({
+        "LLM_BACKEND": "fake",
+        "FAKE_LLM_LATENCY": str(args.latency),
+        "FAKE_LLM_JITTER": str(args.jitter),
+        "FAKE_LLM_FAILURE_RATE": str(args.failure_rate),
+        "FAKE_LLM_SEED": str(args.seed),
+        "QUESTION_BANK_PATH": os.path.join(cache_dir, "question_bank.sqlite3"),
+        "QUESTION_BANK_MIX_RATIO": "0",
+        "EVAL_CACHE_PATH": os.path.join(cache_dir, "evaluations.sqlite3"),
+        "TELEMETRY_JSONL_PATH": os.path.join(cache_dir, "llm_calls.jsonl"),
+        "TELEMETRY_PROM_PATH": os.path.join(cache_dir, "llm_metrics.prom"),
+        # Measure the app's code, not the shared Groq quota limiter
+        "GROQ_REQUESTS_PER_MINUTE": "1000000",
+        "GROQ_REQUEST_BURST": "1000"
+    })
+    from streamlit import logger
+    logger.set_log_level("error")  # Silences bare-mode ScriptRunContext warnings
+
+    import interview_engine
+    from prompts import STAGE_PROMPTS
+
+    parse_question = interview_engine.parse_question
+    check_question = interview_engine.check_question
+
+    print(f"{'benchmark':<22} {'calls/s':>8} {'p50 ms':>9} {'p95 ms':>9} {'retries':>8} {'failed':>8} {'post us':>9}")
+    for stage in STAGE_PROMPTS:
+        retries = []
+        post = []
+        interview_engine.parse_question = timed_calls(parse_question, post)
+        interview_engine.check_question = timed_calls(check_question, post)
+
+        def generate(i):
+            # A unique skill per call, so single-flight never merges two iterations
+            return interview_engine.generate_question(
+                "Backend Developer", f"Python {i}", args.model, [], stage, "Medium",
+                notify=retries.append
+            )
+
+        results, latencies, wall = run_concurrently(generate, args.iterations, args.concurrency)
+        failures = sum(1 for question in results if question.startswith("❌"))
+        report(f"generate:{stage}", latencies, wall, len(retries), failures, post)
+
+    interview_engine.parse_question = parse_question
+    interview_engine.check_question = check_question
+
+    def evaluate(i):
+        # Unique answers so the evaluation cache never short-circuits a call,
+        # long enough that the local pre-scorer sends them to the model
+        answer = f"Benchmark answer {i}: it hashes each key to a bucket index, giving average O(1) lookups."
+        return interview_engine.evaluate_answer("What is a hash map?", answer, args.model)
+
+    results, latencies, wall = run_concurrently(evaluate, args.iterations, args.concurrency)
+    report("evaluate", latencies, wall, failures=sum(1 for evaluation in results if "error" in evaluation))
+
+    from structured_output import parse_stats
+    print()
+    for (kind, outcome), count in sorted(parse_stats.snapshot().items()):
+        print(f"parse:{kind}:{outcome:<12} {count:>6}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,205 @@
+"""Concurrent multi-session load test for App.py.
+
+Drives many simulated interviews at once through Streamlit's AppTest, one
+thread per session, all sharing the process's caches, pools and limiter the
+way sessions of one server do. LLM calls go to the offline fake backend
+(LLM_BACKEND=fake). Every session scripts a realistic flow: configure the
+sidebar, then for each question wait a few timer ticks, type an answer,
+submit it and move on. For each number of sessions it reports reruns per
+second, rerun time percentiles and the process's RSS growth.
+
+AppTest swaps process-wide globals (runtime, secrets) on every run, so script
+runs are serialized by a lock; background model calls still overlap. That
+makes reruns/s a serial lower bound, not the capacity of a server, where
+script threads of different sessions run side by side: total rerun time
+grows with the session count by construction. So each rerun is split into
+its time in the script ("run", which shows how per-rerun cost degrades as
+sessions and background work pile up) and its wait for the lock ("queue",
+an artifact of the harness), and "busy" is the share of wall time the lock
+was held; near 100% the level is limited by the harness, not the app.
+AppTest has no fragment-only reruns either, so timer ticks here are full
+reruns. For real capacity figures, drive a `streamlit run` server instead.
+
+    python benchmarks/load_sessions.py --sessions 1,5,10,25 --questions 3 --latency 0.2 2>/dev/null
+"""
+import argparse
+import gc
+import os
+import random
+import resource
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+APP_PATH = os.path.join(ROOT, "App.py")
+sys.path.insert(0, ROOT)
+
+from util import percentile  # noqa: E402
+
+# One script run at a time across all sessions (see above)
+RUN_LOCK = threading.Lock()
+
+ANSWERS = [
+    "It keeps a hash table from keys to buckets, so lookups are O(1) on average; "
+    "the trade-off is memory, and collisions degrade it for adversarial keys.",
+    "I would use a generator so the whole file is never held in memory, for example "
+    "`for line in f:`, and handle the empty file as an edge case.",
+    "Not sure",
+    "Indexes speed up reads at the cost of slower writes and extra storage, so I add "
+    "them for selective filters and check the query plan first."
+]
+
+
+def rss_bytes():
+    # Current resident set size; peak RSS where /proc is not available
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except OSError:
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+class Session:
+    """One simulated candidate; every interaction is timed as a rerun."""
+
+    def __init__(self, seed, think):
+        from streamlit.testing.v1 import AppTest
+
+        # No secrets: AppTest swaps them process-wide on every run, and the
+        # fake backend does not need a key
+        self.at = AppTest.from_file(APP_PATH, default_timeout=120)
+        self.random = random.Random(seed)
+        self.think = think
+        self.run_times = []  # Script time, without waiting for RUN_LOCK
+        self.queue_times = []  # Time spent waiting for RUN_LOCK
+        self.errors = 0
+
+    def rerun(self, element=None):
+        if self.think:
+            time.sleep(self.random.uniform(0, 2 * self.think))
+        start = time.perf_counter()
+        with RUN_LOCK:
+            acquired = time.perf_counter()
+            (element or self.at).run()
+        self.queue_times.append(acquired - start)
+        self.run_times.append(time.perf_counter() - acquired)
+        self.errors += len(self.at.exception)
+
+    def widget(self, kind, label):
+        return next(w for w in getattr(self.at, kind) if w.label.startswith(label))
+
+    def button(self, label):
+        return next((b for b in self.at.button if b.label.startswith(label)), None)
+
+    def interview(self, questions, ticks):
+        self.rerun()
+        self.rerun(self.at.number_input[0].set_value(questions))
+        self.rerun(self.widget("selectbox", "Stage:").select("coding"))
+        self.rerun(self.widget("selectbox", "📚 Coding Skill:").select(self.random.choice(["Python", "SQL", "Go"])))
+        for index in range(questions):
+            for _ in range(ticks):
+                self.rerun()
+            self.at.text_area[0].input(self.random.choice(ANSWERS))
+            self.rerun(self.button("Submit Answer").click())
+            self.rerun()
+            next_button = self.button("Next Question ➡️")
+            if next_button and index < questions - 1:
+                self.rerun(next_button.click())
+
+    def memory_bytes(self):
+        return self.at.session_state["interview"].memory_bytes()
+
+    def close(self):
+        for name in ("prefetcher", "evaluator"):
+            if name in self.at.session_state:
+                self.at.session_state[name].shutdown()
+
+
+def share_script_cache():
+    # AppTest compiles App.py on every run with a fresh ScriptCache, where a
+    # server compiles it once and shares the bytecode between sessions
+    from streamlit.runtime.scriptrunner.script_cache import ScriptCache
+    from streamlit.testing.v1 import app_test
+
+    shared = ScriptCache()
+    app_test.ScriptCache = lambda: shared
+
+
+def run_level(count, args, seed):
+    sessions = [Session(seed + i, args.think) for i in range(count)]
+    barrier = threading.Barrier(count)
+
+    def drive(session):
+        barrier.wait()  # Every session starts together
+        session.interview(args.questions, args.ticks)
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=count) as executor:
+        for future in [executor.submit(drive, session) for session in sessions]:
+            future.result()
+    wall = time.perf_counter() - start
+    return sessions, wall
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sessions", default="1,5,10,25", help="Comma-separated concurrent session counts")
+    parser.add_argument("--questions", type=int, default=3, help="Questions per interview")
+    parser.add_argument("--ticks", type=int, default=2, help="Timer ticks (reruns) before each answer")
+    parser.add_argument("--think", type=float, default=0.0, help="Mean seconds a candidate waits between actions")
+    parser.add_argument("--latency", type=float, default=0.2, help="Fake model latency in seconds")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    # Use throwaway caches and stores, not the app's own
+    cache_dir = tempfile.mkdtemp(prefix="load-bench-")
+    os.environ["QUESTION_BANK_PATH"] = os.path.join(cache_dir, "question_bank.sqlite3")
+    os.environ["EVAL_CACHE_PATH"] = os.path.join(cache_dir, "evaluations.sqlite3")
+    os.environ["TELEMETRY_JSONL_PATH"] = os.path.join(cache_dir, "llm_calls.jsonl")
+    os.environ["TELEMETRY_PROM_PATH"] = os.path.join(cache_dir, "llm_metrics.prom")
+    os.environ["ASSET_CACHE_DIR"] = os.path.join(cache_dir, "assets")
+    os.environ["SESSION_STORE_PATH"] = os.path.join(cache_dir, "sessions.sqlite3")
+    os.environ["STATE_TEXT_PATH"] = os.path.join(cache_dir, "state_text.sqlite3")
+    os.environ["LLM_BACKEND"] = "fake"
+    os.environ["FAKE_LLM_LATENCY"] = str(args.latency)
+    os.environ["FAKE_LLM_SEED"] = str(args.seed)
+    os.environ["GROQ_REQUESTS_PER_MINUTE"] = "1000000"
+    os.environ["GROQ_REQUEST_BURST"] = "1000000"
+    os.chdir(ROOT)
+
+    os.environ["STREAMLIT_LOGGER_LEVEL"] = "error"  # Applied again whenever AppTest loads the config
+    share_script_cache()
+
+    # Warm imports and process-wide caches so the first level is not a cold start
+    warmup, _ = run_level(1, args, seed=-1)
+    for session in warmup:
+        session.close()
+    del warmup
+    gc.collect()
+    baseline = rss_bytes()
+
+    print(f"{'sessions':>8} {'reruns':>7} {'reruns/s':>9} {'busy %':>7} {'run p50':>8} {'run p95':>8} "
+          f"{'queue p50':>10} {'queue p95':>10} {'rss MiB':>8} {'+KiB/sess':>10} {'state KiB':>10} {'errors':>7}")
+    for count in (int(value) for value in args.sessions.split(",")):
+        sessions, wall = run_level(count, args, seed=args.seed * 1000 + count)
+        gc.collect()
+        rss = rss_bytes()
+        runs = [t for session in sessions for t in session.run_times]
+        queues = [t for session in sessions for t in session.queue_times]
+        state = sum(session.memory_bytes() for session in sessions) / count
+        print(f"{count:>8} {len(runs):>7} {len(runs) / wall:>9.1f} {sum(runs) / wall * 100:>7.0f} "
+              f"{percentile(runs, 0.5) * 1000:>8.1f} {percentile(runs, 0.95) * 1000:>8.1f} "
+              f"{percentile(queues, 0.5) * 1000:>10.1f} {percentile(queues, 0.95) * 1000:>10.1f} "
+              f"{rss / 2 ** 20:>8.1f} {(rss - baseline) / count / 1024:>10.1f} "
+              f"{state / 1024:>10.1f} {sum(session.errors for session in sessions):>7}")
+        for session in sessions:
+            session.close()
+        del sessions
+        gc.collect()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+"""Cold and warm script-execution benchmark for App.py.
+
+Cold runs start a fresh interpreter per sample (imports + first script run);
+warm runs rerun the script inside one process, which is what every widget
+interaction or timer tick costs. LLM calls go to the offline fake backend
+(LLM_BACKEND=fake) so only the app's own startup work is measured.
+
+    python benchmarks/startup.py --cold-runs 3 --warm-runs 20 --budget-cold 6 --budget-warm 0.5
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+APP_PATH = os.path.join(ROOT, "App.py")
+sys.path.insert(0, ROOT)
+
+from util import percentile  # noqa: E402
+
+
+def new_app():
+    from streamlit.testing.v1 import AppTest
+
+    at = AppTest.from_file(APP_PATH, default_timeout=120)
+    at.secrets["GROQ_API_KEY"] = "benchmark"
+    return at
+
+
+def child():
+    start = time.perf_counter()
+    import streamlit  # noqa: F401
+    imported = time.perf_counter()
+    at = new_app()
+    at.run()
+    finished = time.perf_counter()
+    print(json.dumps({
+        "import": imported - start,
+        "first_run": finished - imported,
+        "total": finished - start
+    }))
+
+
+def summarize(name, samples):
+    print(f"{name:<12} n={len(samples):<3} median={statistics.median(samples):.3f}s "
+          f"p95={percentile(samples, 0.95):.3f}s max={max(samples):.3f}s")
+    return statistics.median(samples)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--cold-runs", type=int, default=3)
+    parser.add_argument("--warm-runs", type=int, default=20)
+    parser.add_argument("--budget-cold", type=float, help="Fail if the median cold start exceeds this many seconds")
+    parser.add_argument("--budget-warm", type=float, help="Fail if the median warm rerun exceeds this many seconds")
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        child()
+        return
+
+    # Use a throwaway question bank and evaluation cache, not the app's own
+    cache_dir = tempfile.mkdtemp(prefix="startup-bench-")
+    os.environ["QUESTION_BANK_PATH"] = os.path.join(cache_dir, "question_bank.sqlite3")
+    os.environ["EVAL_CACHE_PATH"] = os.path.join(cache_dir, "evaluations.sqlite3")
+    os.environ["TELEMETRY_JSONL_PATH"] = os.path.join(cache_dir, "llm_calls.jsonl")
+    os.environ["TELEMETRY_PROM_PATH"] = os.path.join(cache_dir, "llm_metrics.prom")
+    os.environ["ASSET_CACHE_DIR"] = os.path.join(cache_dir, "assets")
+    os.environ["SESSION_STORE_PATH"] = os.path.join(cache_dir, "sessions.sqlite3")
+    os.environ["STATE_TEXT_PATH"] = os.path.join(cache_dir, "state_text.sqlite3")
+    os.environ["LLM_BACKEND"] = "fake"
+    os.environ["GROQ_REQUESTS_PER_MINUTE"] = "1000000"
+    os.chdir(ROOT)
+
+    cold = []
+    for _ in range(args.cold_runs):
+        output = subprocess.run(
+            [sys.executable, os.path.abspath(__file__), "--child"],
+            check=True, capture_output=True, text=True
+        ).stdout
+        cold.append(json.loads(output.strip().splitlines()[-1]))
+
+    at = new_app()
+    at.run()
+    warm = []
+    for _ in range(args.warm_runs):
+        start = time.perf_counter()
+        at.run()
+        warm.append(time.perf_counter() - start)
+
+    summarize("cold import", [sample["import"] for sample in cold])
+    summarize("cold script", [sample["first_run"] for sample in cold])
+    cold_median = summarize("cold total", [sample["total"] for sample in cold])
+    warm_median = summarize("warm rerun", warm)
+
+    failed = False
+    if args.budget_cold is not None and cold_median > args.budget_cold:
+        print(f"FAIL: cold start {cold_median:.3f}s exceeds budget {args.budget_cold:.3f}s")
+        failed = True
+    if args.budget_warm is not None and warm_median > args.budget_warm:
+        print(f"FAIL: warm rerun {warm_median:.3f}s exceeds budget {args.budget_warm:.3f}s")
+        failed = True
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+import re
+import threading
+import zlib
+from collections import defaultdict
+from functools import lru_cache
+
+import numpy as np
+
+# Near-duplicate detection for questions: content-word shingles, MinHash
+# signatures and LSH banding, so a lookup only compares against the few
+# questions that share a band instead of the whole collection. Shingles are
+# single words without stop words or the asking verb, so a reworded lead-in
+# ("What is" / "Explain") or swapped terms ("process and thread") still match,
+# where word bigrams only caught near-verbatim copies
+DEDUP_THRESHOLD = 0.8  # Jaccard similarity at which two questions are duplicates
+CONTAINMENT_THRESHOLD = 0.9  # Share of an existing question repeated inside a new one
+# Shorter questions ("What is a linked list?") are contained in many distinct
+# follow-ups, so containment only counts for existing questions this long
+CONTAINMENT_MIN_WORDS = 5
+NUM_PERMUTATIONS = 64
+NUM_BANDS = 16
+ROWS_PER_BAND = NUM_PERMUTATIONS // NUM_BANDS
+
+# Multiply-shift hash family, evaluated for all permutations at once
+_rng = np.random.default_rng(1337)
+_MULTIPLIERS = _rng.integers(1, 2**63, NUM_PERMUTATIONS, dtype=np.uint64)[:, None] | np.uint64(1)
+_OFFSETS = _rng.integers(0, 2**63, NUM_PERMUTATIONS, dtype=np.uint64)[:, None]
+
+STOP_WORDS = frozenset("""
+a an and are as at be between by can could do does for from how i if in into is it its me of on
+or should that the their there this to was we what when where which who why will with would you
+your describe discuss explain give tell
+""".split())
+
+
+def question_core(question):
+    return re.sub(r'[^a-zA-Z0-9]', '', question.lower())
+
+
+def _singular(word):
+    # "indexes" -> "index", "processes" -> "process", "threads" -> "thread"
+    if word.endswith(("xes", "ches", "shes", "sses")):
+        return word[:-2]
+    if len(word) > 3 and word.endswith("s") and not word.endswith("ss"):
+        return word[:-1]
+    return word
+
+
+@lru_cache(maxsize=65536)
+def question_signature(question):
+    # Normalized forms are computed once per distinct question string
+    words = re.findall(r'[a-z0-9]+', question.lower())
+    # A question made only of stop words keeps them all
+    shingles = frozenset(_singular(w) for w in words if w not in STOP_WORDS) or frozenset(words)
+    hashes = np.array([zlib.crc32(shingle.encode()) for shingle in shingles] or [0], dtype=np.uint64)
+    minhash = tuple(((_MULTIPLIERS * hashes + _OFFSETS) >> np.uint64(32)).min(axis=1).tolist())
+    return question_core(question), shingles, minhash
+
+
+def _bands(minhash):
+    return [(i, minhash[i * ROWS_PER_BAND:(i + 1) * ROWS_PER_BAND]) for i in range(NUM_BANDS)]
+
+
+class DedupIndex:
+    def __init__(self, questions=(), threshold=DEDUP_THRESHOLD, containment=CONTAINMENT_THRESHOLD):
+        self.threshold = threshold
+        self.containment = containment
+        self._lock = threading.Lock()
+        self._cores = {}
+        self._buckets = defaultdict(list)
+        for question in questions:
+            self.add(question)
+
+    def __len__(self):
+        return len(self._cores)
+
+    def find(self, question):
+        # Returns the indexed question that `question` duplicates, or None
+        core, shingles, minhash = question_signature(question)
+        with self._lock:
+            if core in self._cores:
+                return self._cores[core]
+            candidates = {q for band in _bands(minhash) for q in self._buckets.get(band, ())}
+        for candidate in candidates:
+            other = question_signature(candidate)[1]
+            overlap = len(shingles & other)
+            if not overlap:
+                continue
+            if overlap / len(shingles | other) >= self.threshold:
+                return candidate
+            if len(other) >= CONTAINMENT_MIN_WORDS and overlap / len(other) >= self.containment:
+                return candidate
+        return None
+
+    def add(self, question):
+        core, _, minhash = question_signature(question)
+        with self._lock:
+            if core in self._cores:
+                return
+            self._cores[core] = question
+            for band in _bands(minhash):
+                self._buckets[band].append(question)
@@ -0,0 +1,97 @@
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+
+import streamlit as st
+
+from util import lru_put, open_sqlite
+
+# Two-tier cache of finished evaluations: an in-process LRU over SQLite
+EVAL_CACHE_PATH = os.environ.get("EVAL_CACHE_PATH", os.path.join(".cache", "evaluations.sqlite3"))
+EVAL_CACHE_MEMORY_SIZE = 1024
+EVAL_CACHE_MAX_ROWS = 50000
+EVAL_CACHE_POLICY = os.environ.get("EVAL_CACHE_POLICY", "lru")
+
+# Which rows the persistent tier drops first once it is over EVAL_CACHE_MAX_ROWS
+EVICTION_ORDER = {
+    "lru": "last_used ASC",
+    "lfu": "hits ASC, last_used ASC",
+    "fifo": "created_at ASC"
+}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS evaluations (
+    key TEXT PRIMARY KEY,
+    payload TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    last_used REAL NOT NULL,
+    hits INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS idx_evaluations_last_used ON evaluations (last_used);
+"""
+
+
+def _normalize(text):
+    return re.sub(r'\s+', ' ', text).strip().lower()
+
+
+def evaluation_key(question, answer, model_name):
+    content = "\0".join([_normalize(question), _normalize(answer), model_name])
+    return hashlib.sha256(content.encode()).hexdigest()
+
+
+class EvaluationCache:
+    def __init__(self, path=EVAL_CACHE_PATH, memory_size=EVAL_CACHE_MEMORY_SIZE,
+                 max_rows=EVAL_CACHE_MAX_ROWS, policy=EVAL_CACHE_POLICY):
+        if policy not in EVICTION_ORDER:
+            raise ValueError(f"Unknown eviction policy: {policy}")
+        self.memory_size = memory_size
+        self.max_rows = max_rows
+        self.policy = policy
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        self._conn = open_sqlite(path, SCHEMA)
+
+    def _remember(self, key, evaluation):
+        lru_put(self._memory, key, evaluation, self.memory_size)
+
+    def get(self, key):
+        with self._lock:
+            if key in self._memory:
+                self._memory.move_to_end(key)
+                return self._memory[key]
+            with self._conn:
+                row = self._conn.execute("SELECT payload FROM evaluations WHERE key = ?", (key,)).fetchone()
+                if row is None:
+                    return None
+                self._conn.execute(
+                    "UPDATE evaluations SET last_used = ?, hits = hits + 1 WHERE key = ?",
+                    (time.time(), key)
+                )
+            evaluation = json.loads(row[0])
+            self._remember(key, evaluation)
+            return evaluation
+
+    def put(self, key, evaluation):
+        now = time.time()
+        with self._lock:
+            self._remember(key, evaluation)
+            with self._conn:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO evaluations (key, payload, created_at, last_used) VALUES (?, ?, ?, ?)",
+                    (key, json.dumps(evaluation), now, now)
+                )
+                self._conn.execute(
+                    "DELETE FROM evaluations WHERE key IN (SELECT key FROM evaluations "
+                    f"ORDER BY {EVICTION_ORDER[self.policy]} LIMIT MAX(0, (SELECT COUNT(*) FROM evaluations) - ?))",
+                    (self.max_rows,)
+                )
+
+
+@st.cache_resource
+def get_evaluation_cache():
+    return EvaluationCache()
@@ -0,0 +1,166 @@
+import asyncio
+import itertools
+import json
+import random
+import re
+import threading
+import time
+from typing import Any, List, Optional
+
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, AIMessageChunk
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+from pydantic import PrivateAttr
+
+# Offline stand-in for ChatGroq with configurable latency, failures and canned
+# outputs, shaped like what the real models send back (including <think>
+# blocks, code fences and malformed JSON)
+QUESTION_OUTPUTS = [
+    "What is the average time complexity of lookup {n} in a hash map that uses chaining?",
+    "<think>The candidate should weigh consistency against availability. Let me draft one question."
+    "</think>How would you shard table {n} once its writes outgrow a single primary?",
+    "Question: A finishes task {n} in 10 days (working alone) and B in 15 days, "
+    "so how long do they need together? Note: show your working.",
+    "```\nprint(sorted(set([{n}, 3, 1, 3])))\n```\nWhat does snippet {n} print and why does the order change?",
+]
+
+# Answers to the structured question prompts, clean and with the slips the
+# repair step exists for (key case, a note after the '?', a lowercase
+# difficulty, plain text instead of JSON)
+QUESTION_RECORDS = [
+    {"question": "What is the average time complexity of lookup {n} in a hash map that uses chaining?",
+     "topic": "Hash maps", "difficulty": "Medium"},
+    {"question": "How would you shard table {n} once its writes outgrow a single primary?",
+     "topic": "Sharding", "difficulty": "Hard"},
+    {"question": "If A finishes task {n} in 10 days and B in 15 days, how long do they need together?",
+     "topic": "Time and work", "difficulty": "Easy"},
+]
+
+STRUCTURED_QUESTION_OUTPUTS = [
+    json.dumps(QUESTION_RECORDS[0]),
+    "```json\n" + json.dumps(QUESTION_RECORDS[1]) + "\n```",
+    "<think>Pick a concept with a real trade-off.</think>\n" + json.dumps(QUESTION_RECORDS[2]),
+    json.dumps({"Question": "Describe a time you untangled incident {n} under pressure? Note: be specific.",
+                "Topic": "Incident response", "difficulty": "medium"}),
+    QUESTION_OUTPUTS[0],
+]
+
+VALID_EVALUATION = json.dumps({
+    "rubric": {
+        "correctness": {"score": 3, "reason": "Mostly correct but misses a minor detail."},
+        "depth": {"score": 2, "reason": "Basic explanation without trade-offs or edge cases."},
+        "relevance": {"score": 4, "reason": "Directly addresses the question."}
+    },
+    "strengths": ["Clear structure"],
+    "suggestions": ["Discuss performance implications", "Mention edge cases"],
+    "total_score": 9
+})
+
+# Answer to the follow-up that asks only for missing rubric items
+FOLLOWUP_OUTPUT = json.dumps({
+    "relevance": {"score": 4, "reason": "Directly addresses the question."}
+})
+
+EVALUATION_OUTPUTS = [
+    VALID_EVALUATION,
+    "```json\n" + VALID_EVALUATION + "\n```",
+    "<think>Checking each rubric item against the answer.</think>\n" + VALID_EVALUATION,
+    VALID_EVALUATION.replace('"score": 2', '"score": "2/4"'),
+    VALID_EVALUATION[:len(VALID_EVALUATION) // 2],
+]
+
+
+class FakeLLMError(Exception):
+    pass
+
+
+def _prompt_text(messages):
+    return "\n".join(str(message.content) for message in messages)
+
+
+def _token_count(text):
+    return len(re.findall(r'\S+', text))
+
+
+class FakeChatModel(BaseChatModel):
+    model_name: str = "fake"
+    temperature: float = 0.0
+    latency: float = 0.0  # Seconds before the (first token of the) response
+    jitter: float = 0.0  # Extra uniformly random latency, in seconds
+    failure_rate: float = 0.0  # Probability that a call raises FakeLLMError
+    seed: Optional[int] = None
+    question_outputs: List[str] = QUESTION_OUTPUTS
+    structured_question_outputs: List[str] = STRUCTURED_QUESTION_OUTPUTS
+    evaluation_outputs: List[str] = EVALUATION_OUTPUTS
+
+    _rng: Any = PrivateAttr()
+    _counter: Any = PrivateAttr()
+    _lock: Any = PrivateAttr()
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self._rng = random.Random(self.seed)
+        self._counter = itertools.count()
+        self._lock = threading.Lock()
+
+    @property
+    def _llm_type(self):
+        return "fake-chat"
+
+    def _plan(self, messages):
+        # Decides delay, failure and content up front so sync, async and
+        # streaming calls behave identically
+        prompt = _prompt_text(messages)
+        with self._lock:
+            delay = self.latency + self._rng.uniform(0, self.jitter)
+            failed = self._rng.random() < self.failure_rate
+            n = next(self._counter)
+            if "Score only these rubric criteria" in prompt:
+                content = FOLLOWUP_OUTPUT
+            elif "Evaluate the interview answer" in prompt:
+                content = self._rng.choice(self.evaluation_outputs)
+            elif "JSON list" in prompt:
+                count = int(re.search(r'Generate (\d+) distinct', prompt).group(1))
+                content = json.dumps([
+                    {**record, "question": record["question"].replace("{n}", f"{n}-{i}")}
+                    for i, record in enumerate(self._rng.choice(QUESTION_RECORDS) for _ in range(count))
+                ])
+            elif "JSON object" in prompt:
+                content = self._rng.choice(self.structured_question_outputs).replace("{n}", str(n))
+            else:
+                content = self._rng.choice(self.question_outputs).replace("{n}", str(n))
+        error = FakeLLMError(f"Simulated failure from {self.model_name}") if failed else None
+        return delay, error, content, _token_count(prompt)
+
+    def _message(self, content, prompt_tokens):
+        completion_tokens = _token_count(content)
+        return AIMessage(content=content, usage_metadata={
+            "input_tokens": prompt_tokens,
+            "output_tokens": completion_tokens,
+            "total_tokens": prompt_tokens + completion_tokens
+        })
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs):
+        delay, error, content, prompt_tokens = self._plan(messages)
+        time.sleep(delay)
+        if error:
+            raise error
+        return ChatResult(generations=[ChatGeneration(message=self._message(content, prompt_tokens))])
+
+    async def _agenerate(self, messages, stop=None, run_manager=None, **kwargs):
+        delay, error, content, prompt_tokens = self._plan(messages)
+        await asyncio.sleep(delay)
+        if error:
+            raise error
+        return ChatResult(generations=[ChatGeneration(message=self._message(content, prompt_tokens))])
+
+    def _stream(self, messages, stop=None, run_manager=None, **kwargs):
+        delay, error, content, prompt_tokens = self._plan(messages)
+        time.sleep(delay)
+        if error:
+            raise error
+        for token in re.split(r'(\s)', content):
+            chunk = ChatGenerationChunk(message=AIMessageChunk(content=token))
+            if run_manager:
+                run_manager.on_llm_new_token(token, chunk=chunk)
+            yield chunk
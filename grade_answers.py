@@ -0,0 +1,162 @@
+"""Headless batch grading of archived interview answers.
+
+Reads a JSONL file of {"id", "question", "answer", "model", "stage"} records
+("id", "model" and "stage" are optional; records without an id are keyed by
+line number) and grades them with the same evaluate_answer() and
+EVALUATION_PROMPT the app uses, on a bounded pool of worker threads. Each
+result is appended to the output JSONL as soon as it finishes, and the output
+doubles as the checkpoint: rerunning the same command skips every id already
+in it, so an interrupted run resumes where it stopped. Throughput is capped
+by the same rate limiter as the app (GROQ_REQUESTS_PER_MINUTE /
+GROQ_REQUEST_BURST), not only by --workers.
+
+    GROQ_API_KEY=... python grade_answers.py answers.jsonl graded.jsonl --workers 8
+"""
+import argparse
+import json
+import os
+import sys
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+DEFAULT_MODEL = "gemma2-9b-it"
+PROGRESS_EVERY = 25  # Results between progress lines on stderr
+
+
+def read_records(path, default_model):
+    with open(path) as f:
+        for line_number, line in enumerate(f, 1):
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+                question, answer = record["question"], record["answer"]
+            except (ValueError, KeyError, TypeError) as e:
+                print(f"Skipping line {line_number}: {e}", file=sys.stderr)
+                continue
+            yield {
+                "id": str(record.get("id", line_number)),
+                "question": question,
+                "answer": answer,
+                "model": record.get("model") or default_model,
+                # Aptitude and coding answers are never failed for being short
+                "stage": record.get("stage")
+            }
+
+
+def completed_ids(path, retry_failed):
+    # Ids already graded in an earlier run; a line cut off by a crash is ignored
+    done = set()
+    if not os.path.exists(path):
+        return done
+    with open(path) as f:
+        for line in f:
+            try:
+                result = json.loads(line)
+            except ValueError:
+                continue
+            if result.get("status") == "ok" or not retry_failed:
+                done.add(result["id"])
+            else:
+                done.discard(result["id"])
+    return done
+
+
+class ResultWriter:
+    """Appends results to the output JSONL from any worker thread."""
+
+    def __init__(self, path):
+        # Start on a fresh line if the previous run died mid-write
+        if os.path.exists(path) and os.path.getsize(path):
+            with open(path, "rb") as f:
+                f.seek(-1, os.SEEK_END)
+                needs_newline = f.read(1) != b"\n"
+        else:
+            needs_newline = False
+        self._file = open(path, "a")
+        if needs_newline:
+            self._file.write("\n")
+        self._lock = threading.Lock()
+        self.written = 0
+        self.failed = 0
+
+    def write(self, result):
+        with self._lock:
+            self._file.write(json.dumps(result) + "\n")
+            self._file.flush()
+            self.written += 1
+            self.failed += result["status"] != "ok"
+
+    def close(self):
+        self._file.close()
+
+
+def grade(evaluate_answer, record):
+    start = time.perf_counter()
+    evaluation = evaluate_answer(record["question"], record["answer"], record["model"], record["stage"])
+    return {
+        "id": record["id"],
+        "model": record["model"],
+        "status": "failed" if "error" in evaluation else "ok",
+        "elapsed_s": round(time.perf_counter() - start, 3),
+        **evaluation
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("input", help="JSONL file of question/answer records")
+    parser.add_argument("output", help="JSONL file results are appended to (and resumed from)")
+    parser.add_argument("--workers", type=int, default=4, help="Answers graded concurrently")
+    parser.add_argument("--model", default=DEFAULT_MODEL, help="Model for records that do not name one")
+    parser.add_argument("--retry-failed", action="store_true", help="Grade ids whose earlier result failed again")
+    args = parser.parse_args()
+
+    from streamlit import logger
+    logger.set_log_level("error")  # Silences bare-mode ScriptRunContext warnings
+
+    from interview_engine import evaluate_answer
+
+    done = completed_ids(args.output, args.retry_failed)
+    writer = ResultWriter(args.output)
+    started = time.perf_counter()
+    skipped = 0
+
+    def report():
+        rate = writer.written / max(time.perf_counter() - started, 1e-9)
+        print(f"graded {writer.written} ({writer.failed} failed, {skipped} already done) {rate:.2f}/s",
+              file=sys.stderr)
+
+    # At most two records per worker are queued, so memory stays flat however
+    # large the input is
+    pending = set()
+    with ThreadPoolExecutor(max_workers=args.workers, thread_name_prefix="grader") as executor:
+        try:
+            for record in read_records(args.input, args.model):
+                if record["id"] in done:
+                    skipped += 1
+                    continue
+                done.add(record["id"])  # Duplicate ids in the input are graded once
+                if len(pending) >= 2 * args.workers:
+                    finished, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in finished:
+                        writer.write(future.result())
+                        if writer.written % PROGRESS_EVERY == 0:
+                            report()
+                pending.add(executor.submit(grade, evaluate_answer, record))
+            for future in wait(pending).done:
+                writer.write(future.result())
+        except KeyboardInterrupt:
+            # Whatever finished is already on disk; the rest is picked up on resume
+            for future in pending:
+                future.cancel()
+            print("Interrupted; rerun the same command to resume.", file=sys.stderr)
+        finally:
+            report()
+            writer.close()
+    sys.exit(1 if writer.failed else 0)
+
+
+if __name__ == "__main__":
+    main()
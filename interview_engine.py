@@ -0,0 +1,513 @@
+import asyncio
+import itertools
+import json
+import re
+
+import streamlit as st
+from langchain_core.runnables import RunnableLambda
+from pydantic import ValidationError
+
+from background import run_async
+from dedup import DedupIndex, question_core
+from eval_cache import evaluation_key, get_evaluation_cache
+from llm_clients import get_chat_model
+from prescore import get_prescorer
+from prompts import (BATCH_PROMPTS, EVALUATION_FOLLOWUP_PROMPT, EVALUATION_PROMPT, QUESTION_PROMPTS,
+                     RUBRIC_CRITERIA, STAGE_PROMPTS)
+from question_bank import get_question_bank
+from resilience import get_resilience
+from singleflight import get_single_flight, request_key
+from structured_output import (GeneratedQuestion, extract_json, normalize_evaluation, parse_stats,
+                               repair_question_fields, strip_reasoning)
+from telemetry import get_telemetry
+
+# Model configurations
+MODEL_CONFIG = {
+    "deepseek-r1-distill-qwen-32b": {
+        "temperature": 0.3,
+        "max_retries": 5,
+        "question_prefix": "SQL question:",
+        "hedge_model": "llama-3.3-70b-versatile"
+    },
+    "gemma2-9b-it": {
+        "temperature": 0.5,
+        "max_retries": 4,
+        "question_prefix": "",
+        "hedge_model": "llama-3.3-70b-versatile"
+    },
+    "llama-3.3-70b-versatile": {
+        "temperature": 0.4,
+        "max_retries": 3,
+        "question_prefix": "",
+        "hedge_model": "gemma2-9b-it"
+    }
+}
+
+# Concurrent evaluations when grading all answers at the end of an interview
+EVALUATION_CONCURRENCY = 8
+# Attempts per evaluation; output that is not valid JSON is retried at once
+EVALUATION_MAX_ATTEMPTS = 2
+# Seconds to wait for the primary model before racing its hedge_model
+HEDGE_AFTER_SECONDS = 3.0
+
+
+# Adjust question generation logic based on difficulty
+def question_prefix(model_name, difficulty):
+    prefix = MODEL_CONFIG.get(model_name, {}).get("question_prefix", "")
+
+    # Adjust prompt or complexity based on difficulty
+    if difficulty == "Easy":
+        prefix += " (Focus on basic concepts)"
+    elif difficulty == "Medium":
+        prefix += " (Include moderate complexity)"
+    elif difficulty == "Hard":
+        prefix += " (Include edge cases and advanced scenarios)"
+    return prefix
+
+def bank_key(role, skill, stage, difficulty, model_name):
+    # Question bank entry for a request; prompts that ignore the role share
+    # one entry across all roles. None for a stage without a prompt
+    prompt = STAGE_PROMPTS.get(stage)
+    if prompt is None:
+        return None
+    return (role if "role" in prompt.input_variables else "", skill, stage, difficulty, model_name)
+
+def clean_question(raw_question):
+    question = re.sub(r'\<.*?\>', '', raw_question.strip(), flags=re.DOTALL)
+    question = re.sub(r'\(.*?\)|Note:.*|(?s:```.*?```)', '', question)
+    question = re.split(r'\?|```', question)[0].strip() + '?'
+    return question.replace('`', '').strip()
+
+def validate_question(fields, topic, difficulty):
+    # Strict schema first, then a local repair pass; plain-text output is
+    # salvaged with clean_question() rather than spending another call
+    if isinstance(fields, str):
+        fields = {"question": clean_question(strip_reasoning(fields))}
+    if not isinstance(fields, dict):
+        parse_stats.record("question", "failed")
+        raise ValueError("Question output is not a JSON object")
+    try:
+        question = GeneratedQuestion.model_validate(fields)
+        parse_stats.record("question", "clean")
+    except ValidationError:
+        try:
+            question = GeneratedQuestion.model_validate(repair_question_fields(fields, topic, difficulty))
+        except ValidationError:
+            parse_stats.record("question", "failed")
+            raise
+        parse_stats.record("question", "repaired")
+    return question
+
+def parse_question(raw_output, topic, difficulty):
+    try:
+        fields = extract_json(raw_output, expected=dict)
+    except ValueError:
+        fields = raw_output
+    return validate_question(fields, topic, difficulty)
+
+def check_question(question, existing_questions):
+    # Prevent exact and near duplicates; signatures are cached per question,
+    # so rebuilding the index for a session's questions is cheap
+    if not question.endswith('?'):
+        raise ValueError("Missing question mark")
+    duplicate = DedupIndex(existing_questions).find(question)
+    if duplicate is None:
+        return
+    if question_core(duplicate) == question_core(question):
+        raise ValueError("Duplicate question core detected")
+    raise ValueError("Near-duplicate question detected")
+
+def shared_invoke(chain, model_name, key, inputs, max_attempts=1, config=None):
+    # Concurrent identical requests (e.g. a cohort starting the same stage
+    # together) share one guarded upstream call and its response; tokens are
+    # only counted against the caller that made the call
+    return get_single_flight().do(key, lambda: get_resilience().call(
+        model_name, lambda: chain.invoke(inputs, config=config), max_attempts=max_attempts
+    ))
+
+async def race_question(role, skill, model_name, existing_questions, stage, difficulty, hedge_after, config=None):
+    # Sends the prompt to the primary model and, if it has not answered within
+    # hedge_after seconds, to its hedge_model too. The first valid question wins
+    # and the other request is cancelled; returns None if every attempt failed
+    prompt = QUESTION_PROMPTS[stage]
+
+    async def attempt(name):
+        temperature = MODEL_CONFIG.get(name, {}).get("temperature", 0.5)
+        inputs = {
+            "role": role,
+            "skill": skill,
+            "question_prefix": question_prefix(name, difficulty),
+            "difficulty": difficulty
+        }
+        chain = prompt | get_chat_model(name, temperature)
+        response = await get_single_flight().ado(
+            request_key("generate", name, temperature, 0, prompt.format(**inputs)),
+            lambda: get_resilience().acall(name, lambda: chain.ainvoke(inputs, config=config), max_attempts=1)
+        )
+        question = parse_question(response.content, skill, difficulty).question
+        check_question(question, existing_questions)
+        return question
+
+    tasks = {asyncio.create_task(attempt(model_name))}
+    done, _ = await asyncio.wait(tasks, timeout=hedge_after)
+    hedge_model = MODEL_CONFIG.get(model_name, {}).get("hedge_model")
+    if not done and hedge_model:
+        tasks.add(asyncio.create_task(attempt(hedge_model)))
+    try:
+        while tasks:
+            done, tasks = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                if task.exception() is None:
+                    return task.result()
+        return None
+    finally:
+        for task in tasks:
+            task.cancel()
+
+def generate_question(role, skill, model_name, existing_questions, stage, difficulty, notify=st.toast,
+                      hedge_after=None):
+    config = MODEL_CONFIG.get(model_name, {})
+    max_retries = config.get("max_retries", 3)
+    prefix = question_prefix(model_name, difficulty)
+
+    # Serve from the question bank first
+    prompt = STAGE_PROMPTS.get(stage)
+    bank = get_question_bank()
+    bank_entry = bank_key(role, skill, stage, difficulty, model_name)
+    if bank_entry is not None:
+        cached = bank.fetch(bank_entry, existing_questions)
+        if cached:
+            return cached
+
+    temperature = config.get("temperature", 0.5)
+    model = get_chat_model(model_name, temperature)
+    variants = itertools.count()
+
+    def attempt():
+        if prompt is None:
+            raise ValueError("Invalid stage selected")
+
+        structured_prompt = QUESTION_PROMPTS[stage]
+        chain = structured_prompt | model
+
+        existing_list = "\n".join([f"{i+1}. {q}" for i, q in enumerate(existing_questions[-5:])])
+        existing_display = f"Existing questions:\n{existing_list}" if existing_questions else "No existing questions"
+
+        inputs = {
+            "role": role,
+            "skill": skill,
+            "existing_questions": existing_display,
+            "question_prefix": prefix,
+            "difficulty": difficulty
+        }
+        # Each retry is its own variant, so a session that rejected a shared
+        # question does not get the same one back
+        key = request_key("generate", model_name, temperature, next(variants), structured_prompt.format(**inputs))
+        response = shared_invoke(chain, model_name, key, inputs, config=trace.config)
+
+        question = parse_question(response.content, skill, difficulty).question
+        check_question(question, existing_questions)
+        return question
+
+    def on_retry(attempt, e):
+        trace.on_retry(attempt, e)
+        if notify:
+            notify(f"Retry {attempt+1}/{max_retries}: {str(e)}")
+
+    with get_telemetry().trace(model_name, stage, "generate") as trace:
+        if prompt is not None and hedge_after is not None:
+            question = run_async(race_question(
+                role, skill, model_name, list(existing_questions), stage, difficulty, hedge_after,
+                config=trace.config
+            ))
+            if question:
+                bank.add(bank_entry, question)
+                return question
+
+        # Rate limits and transport errors back off with jitter, invalid output is
+        # retried at once and open circuits or client errors are not retried
+        try:
+            question = get_resilience().retry(attempt, max_attempts=max_retries, on_retry=on_retry)
+            bank.add(bank_entry, question)
+            return question
+        except Exception as e:
+            trace.fail(e)
+            if notify:
+                notify(f"Retry {max_retries}/{max_retries}: {str(e)}")
+    return "❌ Failed to generate valid question after multiple attempts"
+
+def stream_question(role, skill, model_name, existing_questions, stage, difficulty, on_token=None, notify=st.toast,
+                    hedge_after=None):
+    # Streams the completion and stops reading as soon as a complete, valid
+    # question has been seen; anything unusable falls back to generate_question()
+    config = MODEL_CONFIG.get(model_name, {})
+    prompt = STAGE_PROMPTS.get(stage)
+    if prompt is None:
+        return generate_question(role, skill, model_name, existing_questions, stage, difficulty, notify=notify,
+                                 hedge_after=hedge_after)
+
+    bank_entry = bank_key(role, skill, stage, difficulty, model_name)
+    cached = get_question_bank().fetch(bank_entry, existing_questions)
+    if cached:
+        return cached
+
+    chain = prompt | get_chat_model(model_name, config.get("temperature", 0.5))
+    with get_telemetry().trace(model_name, stage, "stream") as trace:
+        stream = chain.stream({
+            "role": role,
+            "skill": skill,
+            "question_prefix": question_prefix(model_name, difficulty)
+        }, config=trace.config)
+        text = ""
+        try:
+            with get_resilience().guard(model_name):
+                for chunk in stream:
+                    text += chunk.content
+                    visible = strip_reasoning(text)
+                    if on_token and visible:
+                        on_token(visible)
+                    # A '?' inside an open parenthetical or code fence is not the end
+                    candidate = next((
+                        visible[:match.end()] for match in re.finditer(r'\?', visible)
+                        if visible.count('(', 0, match.end()) <= visible.count(')', 0, match.end())
+                        and visible.count('```', 0, match.end()) % 2 == 0
+                    ), None)
+                    if candidate is None:
+                        continue
+                    question = clean_question(candidate)
+                    check_question(question, existing_questions)
+                    get_question_bank().add(bank_entry, question)
+                    return question
+        except Exception as e:
+            trace.fail(e)
+            if notify:
+                notify(f"Streaming failed: {str(e)}")
+        finally:
+            stream.close()
+    return generate_question(role, skill, model_name, existing_questions, stage, difficulty, notify=notify,
+                             hedge_after=hedge_after)
+
+def generate_questions_batch(role, skill, model_name, existing_questions, stage, difficulty, count, notify=st.toast,
+                             hedge_after=None):
+    # One call asks for the whole list; anything missing or invalid falls
+    # back to the per-question path
+    config = MODEL_CONFIG.get(model_name, {})
+    prompt = STAGE_PROMPTS.get(stage)
+    questions = []
+    if prompt is not None:
+        bank_entry = bank_key(role, skill, stage, difficulty, model_name)
+        with get_telemetry().trace(model_name, stage, "batch") as trace:
+            try:
+                temperature = config.get("temperature", 0.5)
+                chain = BATCH_PROMPTS[stage] | get_chat_model(model_name, temperature)
+                inputs = {
+                    "role": role,
+                    "skill": skill,
+                    "question_prefix": question_prefix(model_name, difficulty),
+                    "difficulty": difficulty,
+                    "count": count
+                }
+                key = request_key("generate_batch", model_name, temperature, BATCH_PROMPTS[stage].format(**inputs))
+                response = extract_json(shared_invoke(chain, model_name, key, inputs, config=trace.config).content)
+                if isinstance(response, dict) and len(response) == 1:
+                    # e.g. {"questions": [...]}
+                    response = next(iter(response.values()))
+                if not isinstance(response, list):
+                    raise ValueError("Batch output is not a JSON list")
+                for item in response:
+                    if len(questions) == count:
+                        break
+                    try:
+                        question = validate_question(item, skill, difficulty).question
+                        check_question(question, list(existing_questions) + questions)
+                    except ValueError:
+                        continue
+                    questions.append(question)
+                    get_question_bank().add(bank_entry, question)
+            except Exception as e:
+                trace.fail(e)
+                if notify:
+                    notify(f"Batch generation failed: {str(e)}")
+
+    while len(questions) < count:
+        questions.append(generate_question(
+            role, skill, model_name, list(existing_questions) + questions, stage, difficulty, notify=notify,
+            hedge_after=hedge_after
+        ))
+    return questions
+
+def parse_evaluation(raw_output):
+    # Returns the evaluation and the rubric items still missing from it;
+    # scores are coerced to integers and wrapped JSON is extracted
+    try:
+        response, missing = normalize_evaluation(extract_json(raw_output, expected=dict))
+    except ValueError:
+        parse_stats.record("evaluation", "failed")
+        raise
+    if not missing:
+        try:
+            clean = normalize_evaluation(json.loads(raw_output))[0] == response
+        except ValueError:
+            clean = False
+        parse_stats.record("evaluation", "clean" if clean else "repaired")
+    return response, missing
+
+def followup_inputs(question, answer, missing):
+    return {
+        "criteria": ", ".join(f"{key} ({RUBRIC_CRITERIA[key]})" for key in missing),
+        "question": question,
+        "answer": answer
+    }
+
+def complete_evaluation(response, missing, raw_followup):
+    # Merges the follow-up's rubric items; anything still missing is an invalid output
+    try:
+        extra, still_missing = normalize_evaluation(extract_json(raw_followup, expected=dict))
+    except ValueError:
+        still_missing = missing
+    else:
+        still_missing = [key for key in missing if key in still_missing]
+        response["rubric"].update({key: extra["rubric"][key] for key in missing if key in extra["rubric"]})
+    if still_missing:
+        parse_stats.record("evaluation", "failed")
+        raise ValueError(f"Evaluation is missing {', '.join(still_missing)}")
+    parse_stats.record("evaluation", "follow_up")
+    return response
+
+def build_evaluation(response):
+    # Convert scores to integers and calculate totals
+    rubric_scores = {
+        "correctness": int(response["rubric"]["correctness"]["score"]),
+        "depth": int(response["rubric"]["depth"]["score"]),
+        "relevance": int(response["rubric"]["relevance"]["score"])
+    }
+    total_score = sum(rubric_scores.values())
+    binary_score = 1 if total_score >= 9 else 0  # Threshold at 9/12
+
+    return {
+        "rubric_scores": rubric_scores,
+        "total_score": total_score,
+        "binary_score": binary_score,
+        "feedback": "\n".join([
+            f"**{k.title()}** ({v}/4): {response['rubric'][k]['reason']}"
+            for k, v in rubric_scores.items()
+        ]),
+        "strengths": response.get("strengths", []),
+        "suggestions": response.get("suggestions", [])
+    }
+
+def failed_evaluation(error):
+    return {
+        "error": str(error),
+        "rubric_scores": {"correctness": 0, "depth": 0, "relevance": 0},
+        "total_score": 0,
+        "binary_score": 0,
+        "feedback": "Evaluation failed",
+        "strengths": [],
+        "suggestions": []
+    }
+
+def prescored_evaluation(question, answer, stage=None):
+    # A deterministic low score for trivially failing answers, or None
+    response = get_prescorer().check(question, answer, stage)
+    if response is None:
+        return None
+    evaluation = build_evaluation(response)
+    evaluation["prescored"] = response["prescored"]
+    return evaluation
+
+def evaluate_answer(question, answer, model_name, stage=None):
+    prescored = prescored_evaluation(question, answer, stage)
+    if prescored is not None:
+        return prescored
+
+    # Identical (question, answer, model) triples are graded only once
+    cache = get_evaluation_cache()
+    cache_key = evaluation_key(question, answer, model_name)
+    cached = cache.get(cache_key)
+    if cached is not None:
+        return cached
+
+    def attempt(trace):
+        raw_output = shared_invoke(
+            EVALUATION_PROMPT | model, model_name, request_key("evaluate", cache_key),
+            {"question": question, "answer": answer}, config=trace.config
+        ).content
+        response, missing = parse_evaluation(raw_output)
+        if not missing:
+            return response
+        # Ask for just the missing rubric items instead of regrading everything
+        followup = shared_invoke(
+            EVALUATION_FOLLOWUP_PROMPT | model, model_name, request_key("evaluate_followup", cache_key, missing),
+            followup_inputs(question, answer, missing), config=trace.config
+        )
+        return complete_evaluation(response, missing, followup.content)
+
+    with get_telemetry().trace(model_name, "evaluation", "evaluate") as trace:
+        try:
+            model = get_chat_model(model_name, 0.2)
+            evaluation = build_evaluation(get_resilience().retry(
+                lambda: attempt(trace), max_attempts=EVALUATION_MAX_ATTEMPTS, on_retry=trace.on_retry
+            ))
+            cache.put(cache_key, evaluation)
+            return evaluation
+        except Exception as e:
+            trace.fail(e)
+            return failed_evaluation(e)
+
+async def evaluate_answers_async(items, model_name, max_concurrency=EVALUATION_CONCURRENCY, stage=None):
+    # items are (question, answer) pairs; a failure only affects its own item
+    cache = get_evaluation_cache()
+    keys = [evaluation_key(question, answer, model_name) for question, answer in items]
+    results = [
+        prescored_evaluation(question, answer, stage) or cache.get(key) for (question, answer), key in zip(items, keys)
+    ]
+    todo = [i for i, result in enumerate(results) if result is None]
+    if not todo:
+        return results
+
+    model = get_chat_model(model_name, 0.2)
+    chain = EVALUATION_PROMPT | model
+    followup_chain = EVALUATION_FOLLOWUP_PROMPT | model
+    flight = get_single_flight()
+    resilience = get_resilience()
+
+    async def grade_once(inputs, trace):
+        key = evaluation_key(inputs["question"], inputs["answer"], model_name)
+        response = await flight.ado(request_key("evaluate", key), lambda: resilience.acall(
+            model_name, lambda: chain.ainvoke(inputs, config=trace.config), max_attempts=1
+        ))
+        response, missing = parse_evaluation(response.content)
+        if not missing:
+            return response
+        followup_input = followup_inputs(inputs["question"], inputs["answer"], missing)
+        followup = await flight.ado(request_key("evaluate_followup", key, missing), lambda: resilience.acall(
+            model_name, lambda: followup_chain.ainvoke(followup_input, config=trace.config), max_attempts=1
+        ))
+        return complete_evaluation(response, missing, followup.content)
+
+    async def grade(inputs):
+        with get_telemetry().trace(model_name, "evaluation", "evaluate_batch") as trace:
+            return await resilience.aretry(
+                lambda: grade_once(inputs, trace), max_attempts=EVALUATION_MAX_ATTEMPTS, on_retry=trace.on_retry
+            )
+
+    # abatch keeps the concurrency cap; every item still goes through the
+    # shared single-flight, limiter, breaker and retry policy
+    responses = await RunnableLambda(grade).abatch(
+        [{"question": items[i][0], "answer": items[i][1]} for i in todo],
+        config={"max_concurrency": max_concurrency},
+        return_exceptions=True
+    )
+    for i, response in zip(todo, responses):
+        try:
+            if isinstance(response, Exception):
+                raise response
+            results[i] = build_evaluation(response)
+            cache.put(keys[i], results[i])
+        except Exception as e:
+            results[i] = failed_evaluation(e)
+    return results
+
+def evaluate_answers_batch(items, model_name, max_concurrency=EVALUATION_CONCURRENCY, stage=None):
+    return run_async(evaluate_answers_async(items, model_name, max_concurrency, stage))
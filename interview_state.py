@@ -0,0 +1,215 @@
+import hashlib
+import os
+import sys
+import threading
+import time
+from array import array
+from collections import OrderedDict
+
+import streamlit as st
+
+from structured_output import RUBRIC_KEYS
+from util import lru_put, open_sqlite
+
+# Compact per-session interview state. Scores live in flat byte arrays, each
+# graded answer keeps one slotted record, and evaluation text goes through a
+# process-wide TextStore: short strings (strengths, suggestions, common
+# feedback) are shared between sessions and long feedback is spilled to
+# SQLite, so a session only holds its digest
+STATE_TEXT_PATH = os.environ.get("STATE_TEXT_PATH", os.path.join(".cache", "state_text.sqlite3"))
+STATE_SPILL_BYTES = int(os.environ.get("STATE_SPILL_BYTES", 256))  # Longer feedback is kept on disk
+STATE_TEXT_MEMORY_SIZE = 4096  # Shared strings and recently read spilled texts kept in memory
+STATE_TEXT_TTL_SECONDS = float(os.environ.get("SESSION_TTL_SECONDS", 7 * 24 * 3600))
+PASS_THRESHOLD = 9  # Rubric total out of 12 that counts as a pass, as in build_evaluation
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS texts (
+    digest BLOB PRIMARY KEY,
+    text TEXT NOT NULL,
+    last_used REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_texts_last_used ON texts (last_used);
+"""
+
+
+class TextStore:
+    """Shares repeated evaluation text between sessions and keeps long text on disk."""
+
+    def __init__(self, path=STATE_TEXT_PATH, spill_bytes=STATE_SPILL_BYTES,
+                 memory_size=STATE_TEXT_MEMORY_SIZE, ttl=STATE_TEXT_TTL_SECONDS):
+        self.spill_bytes = spill_bytes
+        self.memory_size = memory_size
+        # An LRU instead of sys.intern, which would keep every string forever
+        self._shared = OrderedDict()
+        self._spilled = OrderedDict()
+        self._lock = threading.Lock()
+        self._conn = open_sqlite(path, SCHEMA)
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM texts WHERE last_used < ?", (time.time() - ttl,))
+
+    def share(self, text):
+        # Returns an equal string already held by another session, if any
+        with self._lock:
+            shared = self._shared.get(text)
+            if shared is None:
+                shared = text
+            lru_put(self._shared, shared, shared, self.memory_size)
+            return shared
+
+    def put(self, text):
+        # A short text is shared and returned as is; a long one is written to
+        # disk once and its 16-byte digest is returned instead
+        if len(text.encode()) <= self.spill_bytes:
+            return self.share(text)
+        digest = hashlib.blake2b(text.encode(), digest_size=16).digest()
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT INTO texts (digest, text, last_used) VALUES (?, ?, ?) "
+                "ON CONFLICT (digest) DO UPDATE SET last_used = excluded.last_used",
+                (digest, text, time.time())
+            )
+        return digest
+
+    def get(self, ref):
+        if isinstance(ref, str):
+            return ref
+        with self._lock:
+            text = self._spilled.get(ref)
+            if text is None:
+                row = self._conn.execute("SELECT text FROM texts WHERE digest = ?", (ref,)).fetchone()
+                text = row[0] if row else "Feedback is no longer available."
+            lru_put(self._spilled, ref, text, self.memory_size)
+            return text
+
+
+@st.cache_resource
+def get_text_store():
+    return TextStore()
+
+
+class EvaluationRecord:
+    """The text of one graded answer; its scores live in InterviewState.scores."""
+
+    __slots__ = ("feedback", "strengths", "suggestions", "prescored", "error")
+
+    def __init__(self, feedback, strengths, suggestions, prescored=None, error=None):
+        self.feedback = feedback  # str, or the digest of spilled text
+        self.strengths = strengths
+        self.suggestions = suggestions
+        self.prescored = prescored
+        self.error = error
+
+
+class InterviewState:
+    """One interview's questions, answers and grades, in place of parallel lists of dicts."""
+
+    __slots__ = ("config", "questions", "answers", "scores", "graded", "records", "texts")
+
+    def __init__(self, config, num_questions, texts=None):
+        self.config = config  # (model, job role, skill, number of questions, stage)
+        self.questions = []
+        self.answers = [""] * num_questions
+        # Correctness, depth and relevance of question i at [3 * i:3 * i + 3]
+        self.scores = array("B", bytes(len(RUBRIC_KEYS) * num_questions))
+        self.graded = array("B", bytes(num_questions))
+        self.records = [None] * num_questions
+        self.texts = texts or get_text_store()
+
+    def store_evaluation(self, index, evaluation):
+        start = index * len(RUBRIC_KEYS)
+        self.scores[start:start + len(RUBRIC_KEYS)] = array(
+            "B", (evaluation["rubric_scores"][key] for key in RUBRIC_KEYS)
+        )
+        self.graded[index] = 1
+        self.records[index] = EvaluationRecord(
+            self.texts.put(evaluation["feedback"]),
+            tuple(self.texts.share(text) for text in evaluation.get("strengths", [])),
+            tuple(self.texts.share(text) for text in evaluation.get("suggestions", [])),
+            evaluation.get("prescored"),
+            evaluation.get("error")
+        )
+
+    def clear_evaluation(self, index):
+        # Marks an answer as waiting for a grade; its last scores still count
+        self.records[index] = None
+
+    def is_graded(self, index):
+        return self.records[index] is not None
+
+    def rubric_total(self, index=None):
+        if index is None:
+            return sum(self.scores)
+        start = index * len(RUBRIC_KEYS)
+        return sum(self.scores[start:start + len(RUBRIC_KEYS)])
+
+    def passed(self, index):
+        return int(self.graded[index] and self.rubric_total(index) >= PASS_THRESHOLD)
+
+    def passed_count(self):
+        return sum(self.passed(index) for index in range(len(self.graded)))
+
+    def evaluation(self, index):
+        # The evaluation dict the UI shows, rebuilt on demand; {} if ungraded
+        record = self.records[index]
+        if record is None:
+            return {}
+        start = index * len(RUBRIC_KEYS)
+        evaluation = {
+            "rubric_scores": dict(zip(RUBRIC_KEYS, self.scores[start:start + len(RUBRIC_KEYS)])),
+            "total_score": self.rubric_total(index),
+            "binary_score": self.passed(index),
+            "feedback": self.texts.get(record.feedback),
+            "strengths": list(record.strengths),
+            "suggestions": list(record.suggestions)
+        }
+        if record.prescored:
+            evaluation["prescored"] = record.prescored
+        if record.error:
+            evaluation["error"] = record.error
+        return evaluation
+
+    def memory_bytes(self):
+        # Everything this session references, spilled text excepted; strings
+        # shared with other sessions are counted in full, so this is an upper bound
+        seen = set()
+
+        def size(obj):
+            if id(obj) in seen:
+                return 0
+            seen.add(id(obj))
+            return sys.getsizeof(obj)
+
+        total = size(self) + size(self.config) + sum(size(item) for item in self.config or ())
+        for items in (self.questions, self.answers):
+            total += size(items) + sum(size(item) for item in items)
+        total += size(self.scores) + size(self.graded) + size(self.records)
+        for record in self.records:
+            if record is None:
+                continue
+            total += size(record) + size(record.feedback) + size(record.prescored) + size(record.error)
+            for items in (record.strengths, record.suggestions):
+                total += size(items) + sum(size(item) for item in items)
+        return total
+
+    def to_dict(self):
+        # Plain JSON-ready data with the feedback text resolved, for session_store
+        return {
+            "config": self.config,
+            "questions": self.questions,
+            "answers": self.answers,
+            "scores": list(self.scores),
+            "graded": list(self.graded),
+            "evaluations": [self.evaluation(index) or None for index in range(len(self.records))]
+        }
+
+    @classmethod
+    def from_dict(cls, data, texts=None):
+        state = cls(tuple(data["config"]) if data["config"] else None, len(data["answers"]), texts)
+        state.questions = data["questions"]
+        state.answers = data["answers"]
+        state.scores = array("B", data["scores"])
+        state.graded = array("B", data["graded"])
+        for index, evaluation in enumerate(data["evaluations"]):
+            if evaluation:
+                state.store_evaluation(index, evaluation)
+        return state
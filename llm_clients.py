@@ -0,0 +1,64 @@
+import os
+
+import httpx
+import streamlit as st
+
+# "groq" talks to the Groq API; "fake" uses the offline stand-in in fake_llm.py,
+# tuned with the FAKE_LLM_* variables below
+LLM_BACKEND = os.environ.get("LLM_BACKEND", "groq")
+
+# Connection pool shared by every session served by this process
+POOL_LIMITS = httpx.Limits(max_connections=100, max_keepalive_connections=50, keepalive_expiry=120.0)
+POOL_TIMEOUT = httpx.Timeout(60.0, connect=5.0)
+
+
+@st.cache_resource
+def get_http_client():
+    return httpx.Client(limits=POOL_LIMITS, timeout=POOL_TIMEOUT)
+
+
+@st.cache_resource
+def get_async_http_client():
+    # Only ever used from the shared event loop in background.run_async
+    return httpx.AsyncClient(limits=POOL_LIMITS, timeout=POOL_TIMEOUT)
+
+
+def fake_chat_model(model_name, temperature):
+    from fake_llm import FakeChatModel
+
+    seed = os.environ.get("FAKE_LLM_SEED")
+    return FakeChatModel(
+        model_name=model_name,
+        temperature=temperature,
+        latency=float(os.environ.get("FAKE_LLM_LATENCY", 0)),
+        jitter=float(os.environ.get("FAKE_LLM_JITTER", 0)),
+        failure_rate=float(os.environ.get("FAKE_LLM_FAILURE_RATE", 0)),
+        seed=int(seed) if seed else None
+    )
+
+
+def groq_api_key():
+    # Headless tools such as grade_answers.py have no secrets.toml, so the
+    # environment is checked first
+    return os.environ.get("GROQ_API_KEY") or st.secrets["GROQ_API_KEY"]
+
+
+@st.cache_resource
+def get_chat_model(model_name, temperature):
+    if LLM_BACKEND == "fake":
+        return fake_chat_model(model_name, temperature)
+
+    # One client per (model_name, temperature); all of them reuse the pooled
+    # keep-alive connections instead of paying a new TLS handshake per call.
+    # langchain_groq is slow to import, so it is only loaded once a model is needed
+    from langchain_groq import ChatGroq
+
+    return ChatGroq(
+        temperature=temperature,
+        groq_api_key=groq_api_key(),
+        model_name=model_name,
+        # Retries are owned by resilience.py so they share one backoff policy
+        max_retries=0,
+        http_client=get_http_client(),
+        http_async_client=get_async_http_client()
+    )
@@ -0,0 +1,127 @@
+import os
+import re
+import threading
+from collections import Counter
+
+import streamlit as st
+from streamlit.logger import get_logger
+
+# Local pre-scoring of answers before they are sent to a model. An empty
+# answer, a technical or behavioral answer of a word or two that neither
+# touches the question nor ticks the rubric's depth checklist, or one that
+# only repeats the question gets a deterministic low score without an
+# evaluation call. Everything else is graded by the model as before.
+# PRESCORE=0 turns it off
+PRESCORE_ENABLED = os.environ.get("PRESCORE", "1") not in ("", "0")
+PRESCORE_MIN_WORDS = int(os.environ.get("PRESCORE_MIN_WORDS", 5))  # Shorter answers need overlap or a checklist item
+PRESCORE_MIN_NEW_WORDS = int(os.environ.get("PRESCORE_MIN_NEW_WORDS", 1))  # Content words not taken from the question
+# Stages where a short answer ("6 days", a one-line return) can be the right
+# one, so only empty answers are failed locally there
+SHORT_ANSWER_STAGES = ("aptitude", "coding")
+
+logger = get_logger(__name__)
+
+STOP_WORDS = frozenset("""
+a an and are as at be but by can do does for from how i if in is it its me my
+not of on or so that the this to was we what when where which who why will
+with would you your
+""".split())
+
+# The "Checklist for Depth" items of EVALUATION_PROMPT
+DEPTH_CHECKLIST = {
+    "example": re.compile(r'`|\bdef |\bclass |\breturn\b|\w\(.*\)|[{};]|=>|==|\bfor example\b|\be\.g\.', re.I),
+    "performance": re.compile(r'\bO\(|complexit|performan|latenc|memory|throughput|faster|slower|\bscal', re.I),
+    "trade_offs": re.compile(r'trade-?offs?|downside|drawback|limitation|\bpros\b|\bcons\b|\bversus\b|\bvs\b|however', re.I),
+    "edge_cases": re.compile(r'edge[- ]cases?|corner[- ]cases?|\bempty\b|\bnull\b|\bnone\b|overflow|boundar|invalid', re.I)
+}
+
+CHECKLIST_SUGGESTIONS = {
+    "example": "Include a concrete example or code snippet.",
+    "performance": "Discuss the performance implications.",
+    "trade_offs": "Mention the trade-offs and limitations.",
+    "edge_cases": "Address the edge cases."
+}
+
+REASONS = {
+    "empty": "The answer has no content to assess.",
+    "too_short": "The answer is too short to assess.",
+    "copies_question": "The answer only repeats the question."
+}
+
+
+def content_words(text):
+    # Lower-cased words minus stop words, with a plural "s" dropped
+    words = re.findall(r'[a-z0-9_+#]+', text.lower())
+    return {w[:-1] if len(w) > 3 and w.endswith("s") else w for w in words if w not in STOP_WORDS}
+
+
+class PreScorer:
+    """Fails trivially bad answers locally, before they cost an evaluation call."""
+
+    def __init__(self, enabled=PRESCORE_ENABLED, min_words=PRESCORE_MIN_WORDS, min_new_words=PRESCORE_MIN_NEW_WORDS,
+                 short_answer_stages=SHORT_ANSWER_STAGES):
+        self.enabled = enabled
+        self.min_words = min_words
+        self.min_new_words = min_new_words
+        self.short_answer_stages = short_answer_stages
+        self._counts = Counter()
+        self._lock = threading.Lock()
+
+    def features(self, question, answer):
+        question_words = content_words(question)
+        answer_words = content_words(answer)
+        return {
+            "words": len(answer.split()),
+            "content_words": len(answer_words),
+            "overlap": len(answer_words & question_words),
+            "new_words": len(answer_words - question_words),
+            "checklist": [item for item, pattern in DEPTH_CHECKLIST.items() if pattern.search(answer)]
+        }
+
+    def decide(self, features, stage=None):
+        # The first rule an answer fails, or None to send it to the model
+        if not features["content_words"]:
+            return "empty"
+        if stage in self.short_answer_stages:
+            return None
+        if features["words"] < self.min_words and not features["overlap"] and not features["checklist"]:
+            return "too_short"
+        if features["new_words"] < self.min_new_words:
+            return "copies_question"
+        return None
+
+    def check(self, question, answer, stage=None):
+        # Returns an evaluation response in the prompt's JSON shape for an
+        # answer that fails, otherwise None
+        if not self.enabled:
+            return None
+        features = self.features(question, answer)
+        decision = self.decide(features, stage)
+        with self._lock:
+            self._counts[decision or "passed"] += 1
+        if decision is None:
+            logger.debug("Pre-score passed: %s", features)
+            return None
+        logger.info("Pre-score %s (stage %s), skipping evaluation: %s", decision, stage, features)
+        reason = REASONS[decision]
+        return {
+            "prescored": decision,
+            "rubric": {
+                "correctness": {"score": 0, "reason": reason},
+                "depth": {"score": 1, "reason": reason},
+                "relevance": {"score": 1, "reason": reason}
+            },
+            "strengths": [],
+            "suggestions": ["Answer the question in your own words, in a few full sentences."] + [
+                suggestion for item, suggestion in CHECKLIST_SUGGESTIONS.items() if item not in features["checklist"]
+            ]
+        }
+
+    def snapshot(self):
+        with self._lock:
+            return dict(self._counts)
+
+
+@st.cache_resource
+def get_prescorer():
+    return PreScorer()
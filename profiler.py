@@ -0,0 +1,100 @@
+import cProfile
+import os
+import threading
+import time
+import uuid
+from collections import defaultdict, deque
+
+import streamlit as st
+
+from util import percentile
+
+# Opt-in rerun profiler. APP_PROFILE=1 times each section of App.py on every
+# rerun and keeps rolling percentiles per section for the whole process;
+# APP_PROFILE_CPROFILE=1 additionally keeps a cProfile per session and dumps
+# it to APP_PROFILE_DIR/<session>.prof after every run (open it with snakeviz
+# or turn it into a flamegraph with flameprof)
+PROFILE_ENABLED = os.environ.get("APP_PROFILE", "0") not in ("", "0")
+PROFILE_CPROFILE = os.environ.get("APP_PROFILE_CPROFILE", "0") not in ("", "0")
+PROFILE_DIR = os.environ.get("APP_PROFILE_DIR", os.path.join(".cache", "profiles"))
+PROFILE_WINDOW = 500  # Samples per section the percentiles are computed over
+
+
+class SectionStats:
+    def __init__(self, window=PROFILE_WINDOW):
+        self._samples = defaultdict(lambda: deque(maxlen=window))
+        self._lock = threading.Lock()
+
+    def record(self, section, seconds):
+        with self._lock:
+            self._samples[section].append(seconds)
+
+    def summary(self):
+        with self._lock:
+            samples = {section: list(values) for section, values in self._samples.items()}
+        return [{
+            "section": section,
+            "runs": len(values),
+            "p50_ms": round(percentile(values, 0.5) * 1000, 2),
+            "p95_ms": round(percentile(values, 0.95) * 1000, 2),
+            "p99_ms": round(percentile(values, 0.99) * 1000, 2),
+            "max_ms": round(max(values) * 1000, 2)
+        } for section, values in samples.items()]
+
+
+@st.cache_resource
+def get_section_stats():
+    return SectionStats()
+
+
+# cProfile hooks the whole process on Python 3.12+ (sys.monitoring), so one
+# session's run is profiled at a time and concurrent runs go without it
+_CPROFILE_SLOT = threading.Lock()
+
+
+class RerunProfile:
+    """Times the sections of one session's script runs; a no-op unless profiling is enabled."""
+
+    def __init__(self, enabled=PROFILE_ENABLED, cprofile=PROFILE_CPROFILE, profile_dir=PROFILE_DIR):
+        self.enabled = enabled
+        self.stats = get_section_stats() if enabled else None
+        self.path = None
+        self._profile = None
+        self._profiling = False
+        if enabled and cprofile:
+            os.makedirs(profile_dir, exist_ok=True)
+            self.path = os.path.join(profile_dir, f"{uuid.uuid4().hex}.prof")
+            self._profile = cProfile.Profile()
+        self._started = self._last = 0.0
+
+    def start(self):
+        if not self.enabled:
+            return
+        if self._profile and _CPROFILE_SLOT.acquire(blocking=False):
+            try:
+                self._profile.enable()
+                self._profiling = True
+            except ValueError:
+                # Another profiler or debugger holds the slot
+                _CPROFILE_SLOT.release()
+        self._started = self._last = time.perf_counter()
+
+    def checkpoint(self, section):
+        # Everything since the previous checkpoint is attributed to `section`
+        if not self.enabled:
+            return
+        now = time.perf_counter()
+        self.stats.record(section, now - self._last)
+        self._last = now
+
+    def finish(self):
+        # Called from a finally in App.py, so it also runs when st.rerun(),
+        # st.stop() or an error ends the script early
+        if not self.enabled:
+            return
+        self.stats.record("total", time.perf_counter() - self._started)
+        if self._profiling:
+            self._profile.disable()
+            self._profiling = False
+            _CPROFILE_SLOT.release()
+            self._profile.dump_stats(self.path)
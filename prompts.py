@@ -0,0 +1,214 @@
+from langchain_core.prompts import ChatPromptTemplate
+
+# Prompt templates are built once per process on first import rather than on
+# every Streamlit rerun of App.py
+
+# Define enhanced prompt templates with specified techniques
+APTITUDE_PROMPT = ChatPromptTemplate.from_messages([
+    ("system", """You are an expert in generating aptitude and logical reasoning questions. Use this process to create unique and diverse questions:
+
+    **Rules**:
+    1. Generate questions only from verified mathematical or logical principles.
+    2. Ensure there is a single correct answer for each question.
+    3. Avoid subjective interpretations, ambiguous phrasing, or overly complex scenarios.
+    4. Include a mix of quantitative and logical reasoning topics.
+    5. Do not use a default topic; generate questions from various stages/topics such as:
+       - Simple interest/Clocks/Calendars/Blood relations/Time and work/Speed and distance/Percentage/yllogisms/Arrangements (e.g., seating, order)/Logical deductions
+
+    **Instructions**:
+    - Focus on the given topic if provided. If no topic is specified, generate questions from different stages/topics listed above.
+    - Use clear and concise language for each question.
+    - Provide at least one example for clarity.
+
+    **Few-Shot Examples**:
+
+    ** Time and Work**
+    Question: "A can complete a task in 10 days, and B can complete the same task in 15 days. How long will it take for both A and B to complete the task together?"
+    Answer: 6 days (1 / (1/10 + 1/15) = 6)
+
+    **Output Rules**:
+    - Single question per output.
+    - No markdown formatting.
+    - Avoid using special characters like `**` at the start or end of questions.
+    - Include at least one example for clarity.
+    """),
+])
+
+CODING_PROMPT = ChatPromptTemplate.from_messages([
+    ("system", """You are an expert coder. Use the following Chain-of-Thought process to generate a coding problem:
+    
+    **Process:**
+    1. **Understand the Skill**: Identify the core concept or skill ({skill}) the problem should focus on.
+    2. **Define the Problem Context**: Create a real-world or abstract scenario where the skill is applied.
+    3. **Break Down the Problem**:
+       - Step 1: Clearly state the input(s) required for the problem.
+       - Step 2: Specify the expected output(s) or goal.
+       - Step 3: Outline any constraints or edge cases.
+    4. **Provide Examples**: Include at least one example with inputs and outputs to clarify the problem.
+    
+    **Rules**:
+    - Use clear and concise language.
+    - Avoid ambiguous terms or overly complex scenarios.
+    - Ensure the problem is solvable within a reasonable time frame.
+    - Include a mix of basic and advanced concepts to challenge the candidate.
+    
+    **Example**:
+    Skill: Arrays
+    Problem Statement: "Given an array of integers, find the two numbers that add up to a specific target value."
+    Input: An array of integers and a target value (e.g., [2, 7, 11, 15], target = 9).
+    Output: Indices of the two numbers that sum to the target (e.g., [0, 1]).
+    Constraints: You may assume there is exactly one solution, and you cannot use the same element twice.
+    Example: 
+      Input: [2, 7, 11, 15], target = 9
+      Output: [0, 1]
+    
+    **Output Rules**:
+    - Single problem per output.
+    - No markdown formatting."""),
+    ("human", """Generate a coding problem about {skill} with:""")
+])
+
+TECHNICAL_PROMPT = ChatPromptTemplate.from_messages([
+    ("system", """You are a technical interviewer for {role} positions. Structure questions using this framework:
+
+For {skill}, analyze through 5 lenses:
+1. Core Theory: Fundamental principles, mathematical foundations, domain laws
+2. System Dynamics: Interactions between components, failure cascades, feedback loops
+3. Implementation Reality: Tradeoffs, debugging nightmares, "it works on my machine" gaps
+4. Evolution: Historical solutions → current best practices → emerging alternatives
+5. Paradoxes: Situations where standard patterns contradict (e.g., CAP theorem)
+
+**Question Design Protocol**
+1. Select 2 knowledge layers → Identify tension/conflict
+2. Frame as concrete scenario requiring prioritization
+3. Demand explanation of ripple effects
+
+**Examples**
+
+1. Skill: Database Engineering  
+   Question: "When would you prioritize ACID compliance over horizontal scalability in a financial system? How does this choice impact disaster recovery strategies?"
+
+**Output Rules**
+1. Force candidate to choose between competing priorities
+2. Require explanation of second-order consequences
+3. Single question (<2 sentences)
+4. Ends with '?'
+5. No markdown"""),
+    
+    ("human", """Create a {skill} question using knowledge layers. {question_prefix}""")
+])
+BEHAVIORAL_PROMPT = ChatPromptTemplate.from_messages([
+    ("system", """You are a behavioral expert. Use the following structured process to generate behavioral questions:
+    
+    **Process:**
+    1. Start with the core skill ({skill}) and identify potential workplace challenges.
+    2. Use Chain-of-Thought reasoning to break down the scenario into logical steps:
+       - Step 1: Identify the challenge.
+       - Step 2: Frame the challenge as a real-world experience.
+       - Step 3: Tailor the question to the role ({role}).
+    3. Use few-shot learning with diverse examples to guide the generation of questions.
+    
+    **Few-Shot Examples:**
+    Example 1:
+    Core Skill: Communication
+    Role: Junior Developer
+    Question: "Describe a time when you had to explain a technical concept to a non-technical team member. How did you ensure they understood?"
+    
+    
+    **Rules:**
+    - Avoid hypothetical scenarios ("Imagine...").
+    - Use "Describe a time..." or "Tell me..." format.
+    - Adapt the complexity and focus based on the role (e.g., junior vs. senior).
+    - Ensure the question is concise (<2 sentences) and ends with '?'.
+    
+    **Output Rules:**
+    - Single question per output.
+    - No markdown formatting."""),
+    ("human", """Create a behavioral question about {skill} for {role}.
+    {question_prefix}""")
+])
+
+
+# Appended to a stage prompt so the question comes back as a GeneratedQuestion
+# (see structured_output.py) instead of free text
+QUESTION_FIELDS = """"question" (one question ending with '?'), "topic" (the concept it tests, in a few words) \
+and "difficulty" ("Easy", "Medium" or "Hard", aiming for {difficulty})"""
+
+QUESTION_INSTRUCTIONS = """Return ONLY a JSON object with the fields """ + QUESTION_FIELDS + """. No other text."""
+
+# Appended to a stage prompt to get a whole interview's questions in one call
+BATCH_INSTRUCTIONS = """Generate {count} distinct questions following the rules above. {question_prefix}
+Return ONLY a JSON list of {count} objects, each with the fields """ + QUESTION_FIELDS + """. No other text."""
+
+STAGE_PROMPTS = {
+    "aptitude": APTITUDE_PROMPT,
+    "coding": CODING_PROMPT,
+    "technical": TECHNICAL_PROMPT,
+    "behavioral": BEHAVIORAL_PROMPT
+}
+
+QUESTION_PROMPTS = {
+    stage: ChatPromptTemplate.from_messages(prompt.messages + [("human", QUESTION_INSTRUCTIONS)])
+    for stage, prompt in STAGE_PROMPTS.items()
+}
+
+BATCH_PROMPTS = {
+    stage: ChatPromptTemplate.from_messages(prompt.messages + [("human", BATCH_INSTRUCTIONS)])
+    for stage, prompt in STAGE_PROMPTS.items()
+}
+
+
+EVALUATION_PROMPT_TEMPLATE = """
+Evaluate the interview answer using these STRICT criteria (1-4 scale):
+1. Correctness: 
+   - 4: Fully accurate with no technical errors, covers all aspects
+   - 3: Mostly correct but missing minor details
+   - 2: Partially correct with significant gaps
+   - 0: Fundamentally incorrect
+2. Depth: 
+   - 4: Advanced concepts + examples + trade-offs + edge cases
+   - 3: Good detail but missing some aspects
+   - 2: Basic explanation only
+   - 1: Superficial treatment
+3. Relevance: 
+   - 4: Directly addresses all parts of question
+   - 3: Mostly relevant with minor tangents
+   - 2: Partially relevant
+   - 1: Off-topic
+Checklist for Depth:
+- [ ] Includes concrete examples/code snippets
+- [ ] Discusses performance implications
+- [ ] Mentions trade-offs/limitations
+- [ ] Addresses edge cases
+Question: {question}
+Answer: {answer}
+JSON Output Format:
+{{
+  "rubric": {{
+    "correctness": {{"score": 1-4, "reason": "detailed technical evaluation"}},
+    "depth": {{"score": 1-4, "reason": "depth analysis with checklist items"}},
+    "relevance": {{"score": 1-4, "reason": "relevance check"}}
+  }},
+  "strengths": ["key strengths"],
+  "suggestions": ["specific improvements based on checklist"],
+  "total_score": "sum of all scores (3-12)"
+}}
+"""
+EVALUATION_PROMPT = ChatPromptTemplate.from_template(EVALUATION_PROMPT_TEMPLATE)
+
+# Short follow-up for rubric items an evaluation left out, so a partly
+# readable evaluation does not cost another full grading call
+RUBRIC_CRITERIA = {
+    "correctness": "technical accuracy, 0 if fundamentally incorrect",
+    "depth": "examples, performance implications, trade-offs and edge cases",
+    "relevance": "how directly it addresses every part of the question"
+}
+
+EVALUATION_FOLLOWUP_PROMPT = ChatPromptTemplate.from_template("""
+Score only these rubric criteria for the interview answer, on the same STRICT 1-4 scale: {criteria}
+Question: {question}
+Answer: {answer}
+Return ONLY a JSON object with one entry per criterion, for example:
+{{"depth": {{"score": 1-4, "reason": "short justification"}}}}
+No other text.
+""")
@@ -0,0 +1,115 @@
+import os
+import random
+import threading
+import time
+
+import streamlit as st
+
+from dedup import DedupIndex
+from util import open_sqlite
+
+# Disk-backed bank of previously generated questions, shared by all sessions
+BANK_PATH = os.environ.get("QUESTION_BANK_PATH", os.path.join(".cache", "question_bank.sqlite3"))
+BANK_TTL_SECONDS = 7 * 24 * 3600  # Questions older than this are never served
+BANK_MAX_ROWS = 20000  # Whole-bank cap, least recently used rows go first
+BANK_MAX_PER_KEY = 200  # Cap per (role, skill, stage, difficulty, model) cell
+BANK_MIX_RATIO = float(os.environ.get("QUESTION_BANK_MIX_RATIO", 0.7))  # Share of questions served from the bank when it has one
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS questions (
+    id INTEGER PRIMARY KEY,
+    role TEXT NOT NULL,
+    skill TEXT NOT NULL,
+    stage TEXT NOT NULL,
+    difficulty TEXT NOT NULL,
+    model TEXT NOT NULL,
+    question TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    last_used REAL NOT NULL,
+    hits INTEGER NOT NULL DEFAULT 0,
+    UNIQUE (role, skill, stage, difficulty, model, question)
+);
+CREATE INDEX IF NOT EXISTS idx_questions_key ON questions (role, skill, stage, difficulty, model);
+CREATE INDEX IF NOT EXISTS idx_questions_last_used ON questions (last_used);
+"""
+
+KEY_FILTER = "role = ? AND skill = ? AND stage = ? AND difficulty = ? AND model = ?"
+
+
+class QuestionBank:
+    def __init__(self, path=BANK_PATH, ttl=BANK_TTL_SECONDS, max_rows=BANK_MAX_ROWS,
+                 max_per_key=BANK_MAX_PER_KEY, mix_ratio=BANK_MIX_RATIO):
+        self.ttl = ttl
+        self.max_rows = max_rows
+        self.max_per_key = max_per_key
+        self.mix_ratio = mix_ratio
+        self._lock = threading.Lock()
+        # One near-duplicate index per bank key, loaded on first use
+        self._indexes = {}
+        self._conn = open_sqlite(path, SCHEMA)
+
+    def fetch(self, key, existing_questions=()):
+        # Returns a fresh-enough bank question not yet used in this session,
+        # or None when the session should generate a new one instead
+        if random.random() >= self.mix_ratio:
+            return None
+        session_index = DedupIndex(existing_questions)
+        with self._lock, self._conn:
+            rows = self._conn.execute(
+                f"SELECT id, question FROM questions WHERE {KEY_FILTER} AND created_at >= ?",
+                (*key, time.time() - self.ttl)
+            ).fetchall()
+            candidates = [row for row in rows if session_index.find(row[1]) is None]
+            if not candidates:
+                return None
+            row_id, question = random.choice(candidates)
+            self._conn.execute(
+                "UPDATE questions SET last_used = ?, hits = hits + 1 WHERE id = ?",
+                (time.time(), row_id)
+            )
+        return question
+
+    def _index(self, key):
+        if key not in self._indexes:
+            rows = self._conn.execute(f"SELECT question FROM questions WHERE {KEY_FILTER}", key).fetchall()
+            self._indexes[key] = DedupIndex(row[0] for row in rows)
+        return self._indexes[key]
+
+    def add(self, key, question):
+        # Paraphrases of a question already in the bank are not stored again
+        now = time.time()
+        with self._lock, self._conn:
+            index = self._index(key)
+            if index.find(question) is not None:
+                return
+            index.add(question)
+            self._conn.execute(
+                "INSERT OR IGNORE INTO questions "
+                "(role, skill, stage, difficulty, model, question, created_at, last_used) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (*key, question, now, now)
+            )
+            self._evict(key, now)
+
+    def _evict(self, key, now):
+        # Indexes of keys that lost rows are rebuilt from the table on next use
+        expired = self._conn.execute("DELETE FROM questions WHERE created_at < ?", (now - self.ttl,)).rowcount
+        trimmed = self._conn.execute(
+            f"DELETE FROM questions WHERE id IN (SELECT id FROM questions WHERE {KEY_FILTER} "
+            "ORDER BY last_used DESC LIMIT -1 OFFSET ?)",
+            (*key, self.max_per_key)
+        ).rowcount
+        overflow = self._conn.execute(
+            "DELETE FROM questions WHERE id IN (SELECT id FROM questions "
+            "ORDER BY last_used DESC LIMIT -1 OFFSET ?)",
+            (self.max_rows,)
+        ).rowcount
+        if expired or overflow:
+            self._indexes.clear()
+        elif trimmed:
+            self._indexes.pop(key, None)
+
+
+@st.cache_resource
+def get_question_bank():
+    return QuestionBank()
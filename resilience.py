@@ -0,0 +1,250 @@
+import asyncio
+import os
+import random
+import threading
+import time
+from contextlib import contextmanager
+
+import streamlit as st
+
+# Shared resilience layer for every LLM call in the process: a token-bucket
+# limiter sized to the Groq quota, a circuit breaker per model and retries
+# with exponential backoff and full jitter, chosen by error type
+REQUESTS_PER_MINUTE = float(os.environ.get("GROQ_REQUESTS_PER_MINUTE", 30))
+REQUEST_BURST = int(os.environ.get("GROQ_REQUEST_BURST", 10))
+LIMITER_MAX_WAIT = 30.0  # Give up instead of queueing behind the limiter for longer
+BACKOFF_BASE = 0.5
+BACKOFF_MAX = 8.0
+BREAKER_FAILURES = 5  # Consecutive failures that open a model's breaker
+BREAKER_COOLDOWN = 30.0  # Seconds an open breaker waits before letting a probe through
+
+# How an error is handled: retried after a backoff, retried straight away
+# (the model answered but the output was unusable) or not retried at all
+RATE_LIMITED = "rate_limited"
+TRANSIENT = "transient"
+INVALID_OUTPUT = "invalid_output"
+FATAL = "fatal"
+
+
+class CircuitOpenError(Exception):
+    pass
+
+
+class RateLimitedError(Exception):
+    pass
+
+
+def classify_error(error):
+    if isinstance(error, CircuitOpenError):
+        return FATAL
+    if isinstance(error, RateLimitedError):
+        return RATE_LIMITED
+    status = getattr(error, "status_code", None)
+    if status == 429 or type(error).__name__ == "RateLimitError":
+        return RATE_LIMITED
+    if status is not None:
+        return TRANSIENT if status >= 500 or status in (408, 409) else FATAL
+    if isinstance(error, ValueError):
+        # Includes LangChain's OutputParserException and our own validation
+        return INVALID_OUTPUT
+    return TRANSIENT
+
+
+def retry_delay(error, attempt):
+    kind = classify_error(error)
+    if kind == INVALID_OUTPUT:
+        return 0.0
+    response = getattr(error, "response", None)
+    retry_after = getattr(response, "headers", {}).get("retry-after") if response is not None else None
+    if kind == RATE_LIMITED and retry_after:
+        try:
+            return min(float(retry_after), BACKOFF_MAX) + random.uniform(0, BACKOFF_BASE)
+        except ValueError:
+            pass
+    return random.uniform(0, min(BACKOFF_MAX, BACKOFF_BASE * 2 ** attempt))
+
+
+class TokenBucket:
+    def __init__(self, rate_per_second, capacity):
+        self.rate = rate_per_second
+        self.capacity = capacity
+        self._tokens = float(capacity)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _reserve(self):
+        # Takes a token if one is available, otherwise returns the wait time
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return 0.0
+            return (1 - self._tokens) / self.rate
+
+    def acquire(self, max_wait=LIMITER_MAX_WAIT):
+        deadline = time.monotonic() + max_wait
+        while (wait := self._reserve()) > 0:
+            if time.monotonic() + wait > deadline:
+                raise RateLimitedError("Local request quota exhausted")
+            time.sleep(wait)
+
+    async def acquire_async(self, max_wait=LIMITER_MAX_WAIT):
+        deadline = time.monotonic() + max_wait
+        while (wait := self._reserve()) > 0:
+            if time.monotonic() + wait > deadline:
+                raise RateLimitedError("Local request quota exhausted")
+            await asyncio.sleep(wait)
+
+
+class CircuitBreaker:
+    def __init__(self, failure_threshold=BREAKER_FAILURES, cooldown=BREAKER_COOLDOWN):
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self._failures = 0
+        self._opened_at = None
+        self._probing = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self):
+        if self._opened_at is None:
+            return "closed"
+        return "half_open" if time.monotonic() - self._opened_at >= self.cooldown else "open"
+
+    def allow(self):
+        with self._lock:
+            state = self.state
+            if state == "closed":
+                return True
+            if state == "half_open" and not self._probing:
+                # Let a single probe through; its outcome closes or re-opens
+                self._probing = True
+                return True
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self._failures = 0
+            self._opened_at = None
+            self._probing = False
+
+    def abandon(self):
+        # A cancelled probe says nothing about the model; let another one through
+        with self._lock:
+            self._probing = False
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            if self._probing or self._failures >= self.failure_threshold:
+                self._opened_at = time.monotonic()
+            self._probing = False
+
+
+class Resilience:
+    def __init__(self, requests_per_minute=REQUESTS_PER_MINUTE, burst=REQUEST_BURST):
+        self.limiter = TokenBucket(requests_per_minute / 60.0, burst)
+        self._breakers = {}
+        self._lock = threading.Lock()
+
+    def breaker(self, model_name):
+        with self._lock:
+            if model_name not in self._breakers:
+                self._breakers[model_name] = CircuitBreaker()
+            return self._breakers[model_name]
+
+    def _record(self, breaker, error):
+        kind = classify_error(error)
+        if kind in (RATE_LIMITED, TRANSIENT):
+            breaker.record_failure()
+        elif kind == INVALID_OUTPUT:
+            # The model itself answered, so it counts as healthy
+            breaker.record_success()
+        else:
+            # A bad request says nothing about the model's health
+            breaker.abandon()
+
+    @contextmanager
+    def guard(self, model_name):
+        # One upstream call: breaker check, quota token, outcome bookkeeping
+        breaker = self.breaker(model_name)
+        if not breaker.allow():
+            raise CircuitOpenError(f"Circuit open for {model_name}")
+        try:
+            self.limiter.acquire()
+        except RateLimitedError:
+            breaker.abandon()
+            raise
+        try:
+            yield
+        except Exception as e:
+            self._record(breaker, e)
+            raise
+        else:
+            breaker.record_success()
+        finally:
+            # Frees the probe after a BaseException too (a Streamlit rerun raised
+            # from on_token mid-stream); a no-op once the outcome is recorded
+            breaker.abandon()
+
+    def retry(self, fn, max_attempts=3, on_retry=None):
+        # Retry policy only; fn is expected to guard its own upstream calls
+        for attempt in range(max_attempts):
+            try:
+                return fn()
+            except Exception as e:
+                if classify_error(e) == FATAL or attempt == max_attempts - 1:
+                    raise
+                if on_retry:
+                    on_retry(attempt, e)
+                time.sleep(retry_delay(e, attempt))
+
+    def call(self, model_name, fn, max_attempts=3, on_retry=None):
+        def guarded():
+            with self.guard(model_name):
+                return fn()
+
+        return self.retry(guarded, max_attempts=max_attempts, on_retry=on_retry)
+
+    async def aretry(self, coro_fn, max_attempts=3, on_retry=None):
+        for attempt in range(max_attempts):
+            try:
+                return await coro_fn()
+            except Exception as e:
+                if classify_error(e) == FATAL or attempt == max_attempts - 1:
+                    raise
+                if on_retry:
+                    on_retry(attempt, e)
+                await asyncio.sleep(retry_delay(e, attempt))
+
+    async def acall(self, model_name, coro_fn, max_attempts=3, on_retry=None):
+        breaker = self.breaker(model_name)
+
+        async def guarded():
+            if not breaker.allow():
+                raise CircuitOpenError(f"Circuit open for {model_name}")
+            try:
+                await self.limiter.acquire_async()
+            except (RateLimitedError, asyncio.CancelledError):
+                breaker.abandon()
+                raise
+            try:
+                result = await coro_fn()
+            except Exception as e:
+                self._record(breaker, e)
+                raise
+            else:
+                breaker.record_success()
+            finally:
+                # As in guard(): a cancelled probe must not keep the breaker open
+                breaker.abandon()
+            return result
+
+        return await self.aretry(guarded, max_attempts=max_attempts, on_retry=on_retry)
+
+
+@st.cache_resource
+def get_resilience():
+    return Resilience()
@@ -0,0 +1,103 @@
+import hashlib
+import json
+import os
+import secrets
+import threading
+import time
+import zlib
+from collections import OrderedDict
+
+import streamlit as st
+
+from interview_state import InterviewState
+from util import lru_put, open_sqlite
+
+# Durable interview sessions, keyed by a resume token kept in the page URL.
+# Each save stores the interview's data (never its worker threads) as
+# compressed JSON, so a refresh, a dropped websocket or a restarted server
+# rebuilds the same interview without asking a model for anything again.
+# Point SESSION_STORE_PATH at a volume that outlives the server process
+SESSION_STORE_PATH = os.environ.get("SESSION_STORE_PATH", os.path.join(".cache", "sessions.sqlite3"))
+SESSION_TTL_SECONDS = float(os.environ.get("SESSION_TTL_SECONDS", 7 * 24 * 3600))
+SESSION_SAVED_DIGESTS = 4096  # Sessions whose last save is remembered, to skip unchanged saves
+SESSION_FORMAT = 4  # Bumped when the saved fields change; older sessions are ignored
+
+# Session state that makes up an interview, next to the InterviewState itself
+SESSION_FIELDS = (
+    "job_role", "skill", "stage", "selected_model", "num_questions", "current_index",
+    "ready_next", "batch_generation", "stream_questions", "hedge_requests", "grade_at_end"
+)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS sessions (
+    token TEXT PRIMARY KEY,
+    payload BLOB NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_sessions_updated_at ON sessions (updated_at);
+"""
+
+
+def new_token():
+    return secrets.token_urlsafe(16)
+
+
+def snapshot(state, prefetched=()):
+    fields = {name: state[name] for name in SESSION_FIELDS if name in state}
+    interview = state["interview"].to_dict() if "interview" in state else None
+    return {"format": SESSION_FORMAT, "fields": fields, "interview": interview, "prefetched": list(prefetched)}
+
+
+class SessionStore:
+    def __init__(self, path=SESSION_STORE_PATH, ttl=SESSION_TTL_SECONDS):
+        self.ttl = ttl
+        self._saved = OrderedDict()  # token -> digest of the last payload written
+        self._lock = threading.Lock()
+        self._conn = open_sqlite(path, SCHEMA)
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM sessions WHERE updated_at < ?", (time.time() - ttl,))
+
+    def _remember(self, token, payload):
+        lru_put(self._saved, token, hashlib.blake2b(payload, digest_size=16).digest(), SESSION_SAVED_DIGESTS)
+
+    def save(self, token, state, prefetched=()):
+        # Returns False when nothing changed since the last save of this token
+        payload = zlib.compress(json.dumps(snapshot(state, prefetched), separators=(",", ":")).encode())
+        with self._lock:
+            if self._saved.get(token) == hashlib.blake2b(payload, digest_size=16).digest():
+                return False
+            with self._conn:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO sessions (token, payload, updated_at) VALUES (?, ?, ?)",
+                    (token, payload, time.time())
+                )
+            self._remember(token, payload)
+        return True
+
+    def load(self, token):
+        # The saved fields and prefetched questions; (None, []) for an
+        # unknown, expired or outdated token
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT payload FROM sessions WHERE token = ? AND updated_at >= ?",
+                (token, time.time() - self.ttl)
+            ).fetchone()
+        if row is None:
+            return None, []
+        try:
+            saved = json.loads(zlib.decompress(row[0]))
+        except (zlib.error, ValueError):
+            return None, []
+        if saved.get("format") != SESSION_FORMAT:
+            return None, []
+        fields = saved["fields"]
+        if saved["interview"]:
+            fields["interview"] = InterviewState.from_dict(saved["interview"])
+        with self._lock:
+            self._remember(token, row[0])
+        return fields, saved["prefetched"]
+
+
+@st.cache_resource
+def get_session_store():
+    return SessionStore()
@@ -0,0 +1,64 @@
+import asyncio
+import hashlib
+import json
+import threading
+from concurrent.futures import Future
+
+import streamlit as st
+
+
+def request_key(*parts):
+    return hashlib.sha256(json.dumps(parts, sort_keys=True, default=str).encode()).hexdigest()
+
+
+class SingleFlight:
+    """Collapses concurrent identical requests into one in-flight call."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}
+        # Async calls all run on the one shared event loop, so they need no lock
+        self._tasks = {}
+
+    def in_flight(self):
+        return len(self._calls) + len(self._tasks)
+
+    def do(self, key, fn):
+        with self._lock:
+            future = self._calls.get(key)
+            leader = future is None
+            if leader:
+                future = self._calls[key] = Future()
+        if not leader:
+            return future.result()
+        try:
+            result = fn()
+            future.set_result(result)
+            return result
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+
+    async def ado(self, key, coro_fn):
+        entry = self._tasks.get(key)
+        if entry is None:
+            entry = self._tasks[key] = [asyncio.ensure_future(coro_fn()), 0]
+        entry[1] += 1
+        try:
+            return await asyncio.shield(entry[0])
+        finally:
+            # The shared call is only cancelled once nobody is waiting for it
+            entry[1] -= 1
+            if entry[1] == 0:
+                if self._tasks.get(key) is entry:
+                    del self._tasks[key]
+                if not entry[0].done():
+                    entry[0].cancel()
+
+
+@st.cache_resource
+def get_single_flight():
+    return SingleFlight()
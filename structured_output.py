@@ -0,0 +1,162 @@
+import json
+import re
+import threading
+from collections import Counter
+from typing import Literal
+
+from langchain_core.utils.json import parse_partial_json
+from pydantic import BaseModel, ConfigDict, field_validator
+
+# Schemas for what the models are asked to return, and the local repair
+# applied to their output before a failed parse costs another round trip
+DIFFICULTIES = ("Easy", "Medium", "Hard")
+MAX_QUESTION_LENGTH = 600
+RUBRIC_KEYS = ("correctness", "depth", "relevance")
+MAX_RUBRIC_SCORE = 4
+
+
+class GeneratedQuestion(BaseModel):
+    model_config = ConfigDict(extra="forbid", str_strip_whitespace=True)
+
+    question: str
+    topic: str
+    difficulty: Literal["Easy", "Medium", "Hard"]
+
+    @field_validator("question")
+    @classmethod
+    def single_question(cls, value):
+        if not value.endswith("?"):
+            raise ValueError("Missing question mark")
+        if len(value.split()) < 3:
+            raise ValueError("Question is too short")
+        if len(value) > MAX_QUESTION_LENGTH:
+            raise ValueError("Question is too long")
+        return value
+
+    @field_validator("topic")
+    @classmethod
+    def non_empty_topic(cls, value):
+        if not value:
+            raise ValueError("Missing topic")
+        return value
+
+
+def strip_reasoning(text):
+    # Drops <think> blocks, including an unclosed one (truncated output or a stream in progress)
+    return re.sub(r'<think>.*?(</think>|$)', '', text, flags=re.DOTALL).strip()
+
+
+def extract_json(text, expected=(dict, list)):
+    # Returns the first JSON value of the expected type in a completion that
+    # may wrap it in reasoning, code fences or prose; raises ValueError if
+    # there is none
+    text = strip_reasoning(text)
+    fenced = re.search(r'```(?:json)?\s*(.*?)```', text, flags=re.DOTALL)
+    if fenced:
+        text = fenced.group(1)
+    decoder = json.JSONDecoder()
+    empty = None
+    for match in re.finditer(r'[\[{]', text):
+        try:
+            value = decoder.raw_decode(text, match.start())[0]
+        except json.JSONDecodeError:
+            # Output cut off mid-object: keep whatever complete fields it has.
+            # That only parses when the rest of the text is JSON, so a bracket
+            # in prose is skipped instead
+            try:
+                value = parse_partial_json(text[match.start():])
+            except json.JSONDecodeError:
+                continue
+        if isinstance(value, expected):
+            if value:
+                return value
+            # An empty {} or [] mentioned in prose loses to any later value
+            empty = value if empty is None else empty
+    if empty is not None:
+        return empty
+    raise ValueError("No JSON found in model output")
+
+
+def repair_question_fields(fields, topic, difficulty):
+    # Fixes the small slips models make (key case, trailing notes after the
+    # '?', difficulty spelling, a missing topic) without another model call
+    fields = {str(key).strip().lower(): value for key, value in fields.items()}
+    question = str(fields.get("question", "")).replace("`", "").strip()
+    if not question.endswith("?") and "?" in question:
+        question = question[:question.rindex("?") + 1]
+    level = str(fields.get("difficulty", "")).strip().title()
+    return {
+        "question": question,
+        "topic": str(fields.get("topic") or topic).strip(),
+        "difficulty": level if level in DIFFICULTIES else difficulty
+    }
+
+
+def coerce_score(value):
+    # Accepts 3, 3.0, "3", "3/4" or "Score: 3 out of 4"; None if unreadable
+    if isinstance(value, bool):
+        return None
+    if isinstance(value, str):
+        match = re.search(r'\d+(\.\d+)?', value)
+        value = match.group() if match else None
+    try:
+        score = round(float(value))
+    except (TypeError, ValueError):
+        return None
+    return min(max(score, 0), MAX_RUBRIC_SCORE)
+
+
+def _as_list(value):
+    if value is None:
+        return []
+    if isinstance(value, str):
+        return [value] if value.strip() else []
+    return [str(item) for item in value] if isinstance(value, list) else [str(value)]
+
+
+def _lower_keys(fields):
+    return {str(key).strip().lower(): value for key, value in fields.items()}
+
+
+def normalize_evaluation(fields):
+    # Brings an evaluation into the prompt's shape with integer scores and
+    # returns it together with the rubric items whose score is missing
+    if not isinstance(fields, dict):
+        raise ValueError("Evaluation output is not a JSON object")
+    fields = _lower_keys(fields)
+    rubric = fields.get("rubric")
+    rubric = _lower_keys(rubric if isinstance(rubric, dict) else fields)
+    items, missing = {}, []
+    for key in RUBRIC_KEYS:
+        item = rubric.get(key)
+        item = _lower_keys(item) if isinstance(item, dict) else {"score": item}
+        score = coerce_score(item.get("score"))
+        if score is None:
+            missing.append(key)
+            continue
+        items[key] = {"score": score, "reason": str(item.get("reason") or "No reason given.")}
+    return {
+        "rubric": items,
+        "strengths": _as_list(fields.get("strengths")),
+        "suggestions": _as_list(fields.get("suggestions"))
+    }, missing
+
+
+class ParseStats:
+    # Counts how model output was parsed, per kind of output: "clean",
+    # "repaired" (fixed locally), "follow_up" (missing fields asked for
+    # separately) or "failed"
+    def __init__(self):
+        self._counts = Counter()
+        self._lock = threading.Lock()
+
+    def record(self, kind, outcome):
+        with self._lock:
+            self._counts[kind, outcome] += 1
+
+    def snapshot(self):
+        with self._lock:
+            return dict(self._counts)
+
+
+parse_stats = ParseStats()
@@ -0,0 +1,242 @@
+import json
+import os
+import threading
+import time
+from collections import Counter, defaultdict, deque
+from contextlib import contextmanager
+
+import streamlit as st
+from langchain_core.callbacks import BaseCallbackHandler
+
+from prescore import get_prescorer
+from resilience import classify_error
+from structured_output import parse_stats
+from util import percentile
+
+# Per-call LLM telemetry: every generate/evaluate call records wall time, time
+# to first token, tokens, retries and failure reason by model and stage. Calls
+# are appended to a JSONL file and summed into a Prometheus text file that a
+# node_exporter textfile collector (or anything else) can scrape
+TELEMETRY_JSONL_PATH = os.environ.get("TELEMETRY_JSONL_PATH", os.path.join(".cache", "llm_calls.jsonl"))
+TELEMETRY_PROM_PATH = os.environ.get("TELEMETRY_PROM_PATH", os.path.join(".cache", "llm_metrics.prom"))
+TELEMETRY_MAX_BYTES = 50 * 1024 * 1024  # JSONL size at which it is rotated to <path>.1
+TELEMETRY_FLUSH_SECONDS = 5.0  # Minimum interval between Prometheus file rewrites
+TELEMETRY_RECENT_CALLS = 1000  # Calls kept in memory for the debug panel's percentiles
+LATENCY_BUCKETS = (0.25, 0.5, 1.0, 2.0, 4.0, 8.0, 16.0, 32.0)
+
+
+class CallTrace(BaseCallbackHandler):
+    """Collects one logical call's timings and token usage from LangChain callbacks."""
+
+    # Called inline from async runs too, instead of in a thread pool
+    run_inline = True
+
+    def __init__(self, model_name, stage, operation):
+        self.model_name = model_name
+        self.stage = stage
+        self.operation = operation
+        self.started = time.perf_counter()
+        self.first_token = None
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+        self.streamed_chunks = 0
+        self.llm_calls = 0
+        self.retries = 0
+        self.failure = None
+
+    def on_llm_new_token(self, token, **kwargs):
+        if self.first_token is None:
+            self.first_token = time.perf_counter()
+        self.streamed_chunks += 1
+
+    def on_llm_end(self, response, **kwargs):
+        # Without streaming the first token arrives with the whole response
+        if self.first_token is None:
+            self.first_token = time.perf_counter()
+        self.llm_calls += 1
+        for generations in response.generations:
+            for generation in generations:
+                usage = getattr(getattr(generation, "message", None), "usage_metadata", None) or {}
+                self.prompt_tokens += usage.get("input_tokens", 0)
+                self.completion_tokens += usage.get("output_tokens", 0)
+
+    def on_retry(self, attempt, error):
+        self.retries += 1
+
+    def fail(self, error):
+        self.failure = f"{classify_error(error)}: {error}"[:300]
+
+    @property
+    def config(self):
+        return {"callbacks": [self]}
+
+    def record(self):
+        finished = time.perf_counter()
+        return {
+            "ts": time.time(),
+            "model": self.model_name,
+            "stage": self.stage,
+            "operation": self.operation,
+            "wall_s": round(finished - self.started, 4),
+            "ttft_s": round(self.first_token - self.started, 4) if self.first_token else None,
+            "prompt_tokens": self.prompt_tokens,
+            # A stream closed early never reports usage; count its chunks instead
+            "completion_tokens": self.completion_tokens or self.streamed_chunks,
+            "llm_calls": self.llm_calls,
+            "retries": self.retries,
+            "failure": self.failure
+        }
+
+
+def _labels(**labels):
+    return "{" + ",".join(f'{key}="{str(value).replace(chr(34), chr(39))}"' for key, value in labels.items()) + "}"
+
+
+class Telemetry:
+    def __init__(self, jsonl_path=TELEMETRY_JSONL_PATH, prom_path=TELEMETRY_PROM_PATH):
+        self.jsonl_path = jsonl_path
+        self.prom_path = prom_path
+        self.recent = deque(maxlen=TELEMETRY_RECENT_CALLS)
+        self._counters = Counter()
+        self._buckets = defaultdict(lambda: [0] * (len(LATENCY_BUCKETS) + 1))
+        self._flushed = 0.0
+        self._lock = threading.Lock()
+        for path in (jsonl_path, prom_path):
+            if path and os.path.dirname(path):
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+
+    @contextmanager
+    def trace(self, model_name, stage, operation):
+        call = CallTrace(model_name, stage, operation)
+        try:
+            yield call
+        except Exception as e:
+            call.fail(e)
+            raise
+        finally:
+            self.record(call.record())
+
+    def record(self, record):
+        key = (record["model"], record["stage"], record["operation"])
+        outcome = record["failure"].split(":", 1)[0] if record["failure"] else "ok"
+        with self._lock:
+            self.recent.append(record)
+            self._counters["calls", key + (outcome,)] += 1
+            self._counters["retries", key] += record["retries"]
+            self._counters["prompt_tokens", key] += record["prompt_tokens"]
+            self._counters["completion_tokens", key] += record["completion_tokens"]
+            self._counters["wall_sum", key] += record["wall_s"]
+            self._counters["wall_count", key] += 1
+            if record["ttft_s"] is not None:
+                self._counters["ttft_sum", key] += record["ttft_s"]
+                self._counters["ttft_count", key] += 1
+            buckets = self._buckets[key]
+            buckets[next((i for i, le in enumerate(LATENCY_BUCKETS) if record["wall_s"] <= le), -1)] += 1
+            if self.jsonl_path:
+                self._append(record)
+            flush = self.prom_path and time.monotonic() - self._flushed >= TELEMETRY_FLUSH_SECONDS
+            if flush:
+                self._flushed = time.monotonic()
+        if flush:
+            self.write_prometheus()
+
+    def _append(self, record):
+        try:
+            if os.path.exists(self.jsonl_path) and os.path.getsize(self.jsonl_path) > TELEMETRY_MAX_BYTES:
+                os.replace(self.jsonl_path, self.jsonl_path + ".1")
+            with open(self.jsonl_path, "a") as f:
+                f.write(json.dumps(record) + "\n")
+        except OSError:
+            pass  # Telemetry must never break an interview
+
+    def summary(self):
+        # One row per (model, stage, operation) over the recent calls
+        with self._lock:
+            recent = list(self.recent)
+        groups = defaultdict(list)
+        for record in recent:
+            groups[record["model"], record["stage"], record["operation"]].append(record)
+        rows = []
+        for (model, stage, operation), records in sorted(groups.items()):
+            walls = [r["wall_s"] for r in records]
+            ttfts = [r["ttft_s"] for r in records if r["ttft_s"] is not None]
+            rows.append({
+                "model": model,
+                "stage": stage,
+                "operation": operation,
+                "calls": len(records),
+                "failed": sum(1 for r in records if r["failure"]),
+                "retries": sum(r["retries"] for r in records),
+                "p50_s": percentile(walls, 0.5),
+                "p95_s": percentile(walls, 0.95),
+                "ttft_p50_s": percentile(ttfts, 0.5),
+                "prompt_tokens": sum(r["prompt_tokens"] for r in records),
+                "completion_tokens": sum(r["completion_tokens"] for r in records)
+            })
+        return rows
+
+    def recent_calls(self, count):
+        with self._lock:
+            return list(self.recent)[-count:][::-1]
+
+    def jsonl(self):
+        with self._lock:
+            return "".join(json.dumps(record) + "\n" for record in self.recent)
+
+    def prometheus(self):
+        with self._lock:
+            counters = dict(self._counters)
+            buckets = {key: list(counts) for key, counts in self._buckets.items()}
+        lines = []
+
+        def family(name, kind, help_text):
+            lines.extend([f"# HELP {name} {help_text}", f"# TYPE {name} {kind}"])
+
+        family("llm_calls_total", "counter", "LLM calls by model, stage, operation and outcome.")
+        for (metric, key), value in sorted(counters.items()):
+            if metric == "calls":
+                model, stage, operation, outcome = key
+                lines.append(f"llm_calls_total{_labels(model=model, stage=stage, operation=operation, outcome=outcome)} {value}")
+        for metric, name, help_text in (
+            ("retries", "llm_retries_total", "Retried attempts."),
+            ("prompt_tokens", "llm_prompt_tokens_total", "Prompt tokens sent."),
+            ("completion_tokens", "llm_completion_tokens_total", "Completion tokens received."),
+            ("ttft_sum", "llm_time_to_first_token_seconds_sum", "Summed time to first token."),
+            ("ttft_count", "llm_time_to_first_token_seconds_count", "Calls with a first token.")
+        ):
+            family(name, "counter", help_text)
+            for (counter, key), value in sorted(counters.items()):
+                if counter == metric:
+                    model, stage, operation = key
+                    lines.append(f"{name}{_labels(model=model, stage=stage, operation=operation)} {round(value, 4)}")
+        family("llm_call_seconds", "histogram", "Wall time per call, retries included.")
+        for key, counts in sorted(buckets.items()):
+            model, stage, operation = key
+            cumulative = 0
+            for le, count in zip(LATENCY_BUCKETS + ("+Inf",), counts):
+                cumulative += count
+                lines.append(f"llm_call_seconds_bucket{_labels(model=model, stage=stage, operation=operation, le=le)} {cumulative}")
+            labels = _labels(model=model, stage=stage, operation=operation)
+            lines.append(f"llm_call_seconds_sum{labels} {round(counters.get(('wall_sum', key), 0), 4)}")
+            lines.append(f"llm_call_seconds_count{labels} {counters.get(('wall_count', key), 0)}")
+        family("llm_parse_total", "counter", "Model output parses by kind and outcome.")
+        for (kind, outcome), value in sorted(parse_stats.snapshot().items()):
+            lines.append(f"llm_parse_total{_labels(kind=kind, outcome=outcome)} {value}")
+        family("answer_prescore_total", "counter", "Answers checked by the local pre-scorer, by decision.")
+        for decision, value in sorted(get_prescorer().snapshot().items()):
+            lines.append(f"answer_prescore_total{_labels(decision=decision)} {value}")
+        return "\n".join(lines) + "\n"
+
+    def write_prometheus(self):
+        # Written to a temporary file first so a scraper never reads half of it
+        try:
+            with open(self.prom_path + ".tmp", "w") as f:
+                f.write(self.prometheus())
+            os.replace(self.prom_path + ".tmp", self.prom_path)
+        except OSError:
+            pass
+
+
+@st.cache_resource
+def get_telemetry():
+    return Telemetry()
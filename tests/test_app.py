@@ -0,0 +1,94 @@
+import os
+import tempfile
+import time
+
+import pytest
+
+# Throwaway stores and the offline backend, set before the app modules load
+CACHE_DIR = tempfile.mkdtemp(prefix="app-test-")
+os.environ.update({
+    "LLM_BACKEND": "fake",
+    "QUESTION_BANK_PATH": os.path.join(CACHE_DIR, "question_bank.sqlite3"),
+    "QUESTION_BANK_MIX_RATIO": "0",
+    "EVAL_CACHE_PATH": os.path.join(CACHE_DIR, "evaluations.sqlite3"),
+    "TELEMETRY_JSONL_PATH": os.path.join(CACHE_DIR, "llm_calls.jsonl"),
+    "TELEMETRY_PROM_PATH": os.path.join(CACHE_DIR, "llm_metrics.prom"),
+    "ASSET_CACHE_DIR": os.path.join(CACHE_DIR, "assets"),
+    "SESSION_STORE_PATH": os.path.join(CACHE_DIR, "sessions.sqlite3"),
+    "STATE_TEXT_PATH": os.path.join(CACHE_DIR, "state_text.sqlite3")
+})
+
+APP_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "App.py")
+PASSING = {
+    "rubric_scores": {"correctness": 4, "depth": 3, "relevance": 4},
+    "feedback": "Good answer.",
+    "strengths": [],
+    "suggestions": []
+}
+
+
+@pytest.fixture
+def app(monkeypatch):
+    import interview_engine
+    from streamlit.testing.v1 import AppTest
+
+    # Questions name the difficulty they were generated at; grading is slow
+    # enough that the candidate moves on before the grade is back
+    def generate_question(existing_questions, difficulty, **kwargs):
+        return f"{difficulty} question {len(existing_questions) + 1}?"
+
+    def evaluate_answer(question, answer, model_name, stage=None):
+        time.sleep(0.5)
+        return PASSING
+
+    monkeypatch.setattr(interview_engine, "generate_question", generate_question)
+    monkeypatch.setattr(interview_engine, "evaluate_answer", evaluate_answer)
+    at = AppTest.from_file(APP_PATH, default_timeout=60)
+    at.secrets["GROQ_API_KEY"] = "test"
+    at.run()
+    yield at
+    for name in ("prefetcher", "evaluator"):
+        if name in at.session_state:
+            at.session_state[name].shutdown()
+
+
+def button(at, label):
+    return next(b for b in at.button if b.label.startswith(label))
+
+
+def test_passed_answer_then_quick_next_gives_a_hard_question(app):
+    assert app.session_state.interview.questions[0].startswith("Medium")
+    app.text_area[0].input("A full answer.")
+    button(app, "Submit Answer").click().run()
+    assert app.session_state.evaluator.is_pending(0)
+    button(app, "➡️ Next Question").click().run()
+    assert not app.exception
+    assert app.session_state.interview.questions[1].startswith("Hard")
+
+
+def test_next_question_is_served_from_the_prefetch(app):
+    prefetcher = app.session_state.prefetcher
+    assert prefetcher.has(1, "Hard") and prefetcher.has(1, "Easy")
+    app.text_area[0].input("A full answer.")
+    button(app, "Submit Answer").click().run()
+    app.session_state.evaluator.wait(0)
+    app.run()  # The grade lands and decides the difficulty of the next question
+    assert not prefetcher.has(1, "Easy")
+    deadline = time.monotonic() + 10
+    while not any(slot == 1 for _, slot, _ in prefetcher.prefetched()) and time.monotonic() < deadline:
+        time.sleep(0.05)
+    [(question, _, difficulty)] = [item for item in prefetcher.prefetched() if item[1] == 1]
+    button(app, "➡️ Next Question").click().run()
+    assert difficulty == "Hard"
+    assert app.session_state.interview.questions[1] == question
+
+
+def test_grade_at_end_keeps_questions_at_medium(app):
+    next(c for c in app.checkbox if "end" in c.label).check().run()
+    for index in range(2):
+        app.text_area[0].input("A full answer.")
+        button(app, "Submit Answer").click().run()
+        button(app, "➡️ Next Question").click().run()
+    assert not app.exception
+    assert all(question.startswith("Medium") for question in app.session_state.interview.questions)
+    assert len(app.session_state.interview.questions) == 3
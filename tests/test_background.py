@@ -0,0 +1,54 @@
+import threading
+
+from background import QuestionPrefetcher
+
+
+class Generator:
+    """Names each question after its difficulty and records which thread made it."""
+
+    def __init__(self):
+        self.calls = []
+
+    def __call__(self, existing_questions, difficulty, **kwargs):
+        self.calls.append((difficulty, threading.current_thread().name))
+        return f"{difficulty} question {len(existing_questions) + 1}"
+
+
+def test_next_slot_is_prefetched_at_both_difficulties_until_the_grade_is_known():
+    generate = Generator()
+    prefetcher = QuestionPrefetcher(generate, depth=2)
+    first = prefetcher.take(0, difficulty="Medium")
+    prefetcher.fill([first], {1: ("Hard", "Easy")})
+    assert prefetcher.has(1, "Hard") and prefetcher.has(1, "Easy")
+    assert prefetcher.take(1, difficulty="Hard").startswith("Hard")
+    assert prefetcher.pending() == 0  # The Easy variant is dropped with it
+    assert all(thread.startswith("question-prefetch") for _, thread in generate.calls)
+    prefetcher.shutdown()
+
+
+def test_known_grade_drops_the_other_variant():
+    generate = Generator()
+    prefetcher = QuestionPrefetcher(generate, depth=2)
+    prefetcher.fill([], {0: ("Medium",), 1: ("Hard", "Easy")})
+    prefetcher.fill([], {0: ("Medium",), 1: ("Easy",), 2: ("Hard", "Easy")})
+    assert not prefetcher.has(1, "Hard")
+    assert prefetcher.has(1, "Easy") and prefetcher.has(2, "Hard")
+    prefetcher.shutdown()
+
+
+def test_stale_prefetch_is_regenerated_on_the_worker():
+    generate = Generator()
+    prefetcher = QuestionPrefetcher(generate, depth=2)
+    prefetcher.fill([], {1: ("Medium",), 2: ("Medium",)})
+    assert prefetcher.take(1, difficulty="Hard").startswith("Hard")
+    assert prefetcher.has(2, "Medium")
+    assert all(thread.startswith("question-prefetch") for _, thread in generate.calls)
+    prefetcher.shutdown()
+
+
+def test_restored_questions_keep_their_slot_and_difficulty():
+    prefetcher = QuestionPrefetcher(Generator(), depth=2)
+    prefetcher.restore([["Saved easy question", 3, "Easy"]])
+    assert prefetcher.prefetched() == [["Saved easy question", 3, "Easy"]]
+    assert prefetcher.take(3, difficulty="Easy") == "Saved easy question"
+    prefetcher.shutdown()
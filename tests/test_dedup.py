@@ -0,0 +1,42 @@
+import pytest
+
+from dedup import DedupIndex
+
+PARAPHRASES = [
+    ("What is the difference between a process and a thread in an operating system?",
+     "Explain the difference between a process and a thread in an operating system?"),
+    ("What is the difference between a process and a thread in an operating system?",
+     "What is the difference between a thread and a process in an operating system?"),
+    ("How does garbage collection work in Python?",
+     "Explain how garbage collection works in Python?"),
+    ("What are the trade-offs of using indexes in a relational database?",
+     "Describe the trade-offs of using an index in a relational database?"),
+    ("How would you shard a table once its writes outgrow a single primary?",
+     "How would you shard a table once its writes outgrow a single primary, and what would you monitor?"),
+]
+
+DISTINCT = [
+    ("How do you reverse a linked list?", "How do you detect a cycle in a linked list?"),
+    ("What is a linked list?", "How do you reverse a linked list in place?"),
+    ("What is the time complexity of binary search?", "What is the time complexity of quicksort?"),
+    ("What is the average time complexity of lookup in a hash map?",
+     "What is the worst-case time complexity of lookup in a hash map?"),
+    ("What is a Python decorator?", "What is a Python context manager?"),
+    ("Tell me about a time you disagreed with your manager?",
+     "Tell me about a time you missed a deadline?"),
+]
+
+
+@pytest.mark.parametrize("existing,new", PARAPHRASES)
+def test_paraphrases_are_duplicates(existing, new):
+    assert DedupIndex([existing]).find(new) == existing
+
+
+@pytest.mark.parametrize("existing,new", DISTINCT)
+def test_different_questions_stay_distinct(existing, new):
+    assert DedupIndex([existing]).find(new) is None
+    assert DedupIndex([new]).find(existing) is None
+
+
+def test_exact_copy_ignores_case_and_punctuation():
+    assert DedupIndex(["What is a Python decorator?"]).find("what is a python DECORATOR") == "What is a Python decorator?"
@@ -0,0 +1,54 @@
+from prescore import PreScorer
+
+APTITUDE_QUESTION = (
+    "A can complete a task in 10 days, and B can complete the same task in 15 days. "
+    "How long will it take for both A and B to complete the task together?"
+)
+DECORATOR_QUESTION = "What is a Python decorator?"
+
+
+def test_short_aptitude_answers_go_to_the_model():
+    scorer = PreScorer(enabled=True)
+    assert scorer.check(APTITUDE_QUESTION, "6 days", stage="aptitude") is None
+    assert scorer.check(APTITUDE_QUESTION, "It takes 6 days in total", stage="aptitude") is None
+
+
+def test_one_line_coding_answer_goes_to_the_model():
+    scorer = PreScorer(enabled=True)
+    question = "Write a Python function that returns the unique numbers of a list in sorted order?"
+    assert scorer.check(question, "return sorted(set(nums))", stage="coding") is None
+
+
+def test_empty_answers_are_failed_in_every_stage():
+    scorer = PreScorer(enabled=True)
+    for stage in ("aptitude", "coding", "technical", "behavioral", None):
+        result = scorer.check(DECORATOR_QUESTION, "it is what it is", stage=stage)
+        assert result["prescored"] == "empty"
+
+
+def test_copies_of_the_question_are_failed_outside_aptitude_and_coding():
+    scorer = PreScorer(enabled=True)
+    copy = "A Python decorator is what a decorator is in Python"
+    assert scorer.check(DECORATOR_QUESTION, copy, stage="technical")["prescored"] == "copies_question"
+    assert scorer.check(DECORATOR_QUESTION, copy, stage="coding") is None
+
+
+def test_short_technical_answers_go_to_the_model():
+    scorer = PreScorer(enabled=True)
+    assert scorer.check(DECORATOR_QUESTION, "A function wrapping another function", stage="technical") is None
+
+
+def test_one_word_technical_and_behavioral_answers_are_failed():
+    scorer = PreScorer(enabled=True)
+    for stage in ("technical", "behavioral"):
+        assert scorer.check(DECORATOR_QUESTION, "Yes", stage=stage)["prescored"] == "too_short"
+        assert scorer.check(DECORATOR_QUESTION, "No idea", stage=stage)["prescored"] == "too_short"
+    assert scorer.check(APTITUDE_QUESTION, "Yes", stage="aptitude") is None
+
+
+def test_short_answers_on_topic_or_with_depth_go_to_the_model():
+    scorer = PreScorer(enabled=True)
+    assert scorer.check(DECORATOR_QUESTION, "Decorators wrap functions", stage="technical") is None
+    assert scorer.check(DECORATOR_QUESTION, "`@cache` on `fib`", stage="technical") is None
+    assert scorer.check(DECORATOR_QUESTION, "Yes", stage="technical") is not None
+    assert PreScorer(enabled=True, min_words=1).check(DECORATOR_QUESTION, "Yes", stage="technical") is None
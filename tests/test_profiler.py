@@ -0,0 +1,27 @@
+import profiler
+from profiler import RerunProfile
+
+
+def test_only_one_cprofile_runs_at_a_time(tmp_path):
+    first = RerunProfile(enabled=True, cprofile=True, profile_dir=str(tmp_path))
+    second = RerunProfile(enabled=True, cprofile=True, profile_dir=str(tmp_path))
+    first.start()
+    second.start()  # Runs without cProfile instead of failing
+    second.finish()
+    first.finish()
+    assert (tmp_path / first.path.split("/")[-1]).exists()
+    assert not (tmp_path / second.path.split("/")[-1]).exists()
+    assert not profiler._CPROFILE_SLOT.locked()
+
+
+def test_run_ended_early_frees_the_cprofile_slot(tmp_path):
+    profile = RerunProfile(enabled=True, cprofile=True, profile_dir=str(tmp_path))
+    for _ in range(2):
+        profile.start()
+        try:
+            raise RuntimeError("st.rerun()")
+        except RuntimeError:
+            pass
+        finally:
+            profile.finish()
+    assert not profiler._CPROFILE_SLOT.locked()
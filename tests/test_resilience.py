@@ -0,0 +1,63 @@
+import asyncio
+import time
+
+import pytest
+
+from resilience import Resilience
+
+
+class StatusError(Exception):
+    def __init__(self, status_code):
+        super().__init__(f"HTTP {status_code}")
+        self.status_code = status_code
+
+
+class Rerun(BaseException):
+    pass
+
+
+def raiser(error):
+    def fn():
+        raise error
+    return fn
+
+
+def half_open_breaker():
+    resilience = Resilience(requests_per_minute=60000, burst=100)
+    breaker = resilience.breaker("model")
+    breaker.cooldown = 0.01
+    for _ in range(breaker.failure_threshold):
+        with pytest.raises(StatusError):
+            resilience.call("model", raiser(StatusError(503)), max_attempts=1)
+    time.sleep(0.02)
+    assert breaker.state == "half_open"
+    return resilience, breaker
+
+
+def test_fatal_probe_releases_the_breaker():
+    resilience, breaker = half_open_breaker()
+    with pytest.raises(StatusError):
+        resilience.call("model", raiser(StatusError(400)), max_attempts=1)
+    assert resilience.call("model", lambda: "ok") == "ok"
+    assert breaker.state == "closed"
+
+
+def test_base_exception_during_probe_releases_the_breaker():
+    resilience, breaker = half_open_breaker()
+    with pytest.raises(Rerun):
+        resilience.call("model", raiser(Rerun()), max_attempts=1)
+    assert resilience.call("model", lambda: "ok") == "ok"
+
+
+def test_cancelled_async_probe_releases_the_breaker():
+    resilience, breaker = half_open_breaker()
+
+    async def cancelled():
+        raise asyncio.CancelledError()
+
+    async def ok():
+        return "ok"
+
+    with pytest.raises(asyncio.CancelledError):
+        asyncio.run(resilience.acall("model", cancelled, max_attempts=1))
+    assert asyncio.run(resilience.acall("model", ok)) == "ok"
@@ -0,0 +1,49 @@
+import json
+
+import pytest
+
+from structured_output import coerce_score, extract_json, normalize_evaluation
+
+EVALUATION = {
+    "rubric": {
+        "correctness": {"score": 3, "reason": "Mostly correct."},
+        "depth": {"score": 2, "reason": "No trade-offs."},
+        "relevance": {"score": 4, "reason": "On topic."}
+    },
+    "strengths": ["Clear structure"],
+    "suggestions": ["Mention edge cases"]
+}
+RAW = json.dumps(EVALUATION)
+
+
+@pytest.mark.parametrize("output", [
+    RAW,
+    "```json\n" + RAW + "\n```",
+    "<think>Checking each rubric item {first} against the answer.</think>\n" + RAW,
+    "Here is my evaluation of the answer:\n" + RAW + "\nLet me know if you need more.",
+    "Here are my [notes] " + RAW,
+    "Score {see below}: " + RAW,
+    "Use dict {} then " + RAW
+])
+def test_evaluation_is_found_in_wrapped_output(output):
+    assert extract_json(output, expected=dict) == EVALUATION
+
+
+def test_truncated_output_keeps_its_complete_fields():
+    evaluation, missing = normalize_evaluation(extract_json(RAW[:len(RAW) // 2], expected=dict))
+    assert evaluation["rubric"]["correctness"]["score"] == 3
+    assert "relevance" in missing
+
+
+def test_fraction_scores_are_coerced():
+    output = RAW.replace('"score": 2', '"score": "2/4"').replace('"score": 4', '"score": "Score: 4 out of 4"')
+    evaluation, missing = normalize_evaluation(extract_json(output, expected=dict))
+    assert not missing
+    assert [evaluation["rubric"][key]["score"] for key in ("correctness", "depth", "relevance")] == [3, 2, 4]
+    assert coerce_score("3.6") == 4 and coerce_score("n/a") is None and coerce_score(True) is None
+
+
+def test_output_without_json_raises():
+    with pytest.raises(ValueError):
+        extract_json("I cannot grade this answer [sorry].", expected=dict)
+    assert extract_json("An empty object: {}", expected=dict) == {}
@@ -0,0 +1,24 @@
+from collections import OrderedDict
+
+from util import lru_put, open_sqlite, percentile
+
+
+def test_lru_put_drops_least_recently_used():
+    lru = OrderedDict()
+    for key in "abc":
+        lru_put(lru, key, key.upper(), 2)
+    lru_put(lru, "b", "B", 2)
+    lru_put(lru, "d", "D", 2)
+    assert list(lru) == ["b", "d"]
+
+
+def test_percentile():
+    assert percentile([], 0.5) is None
+    assert percentile([3, 1, 2], 0.5) == 2
+    assert percentile(range(101), 0.95) == 95
+
+
+def test_open_sqlite_creates_directory_and_schema(tmp_path):
+    conn = open_sqlite(str(tmp_path / "nested" / "db.sqlite3"), "CREATE TABLE t (x INTEGER);")
+    assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+    assert conn.execute("SELECT COUNT(*) FROM t").fetchone()[0] == 0
@@ -0,0 +1,33 @@
+import os
+import sqlite3
+
+# Small helpers shared by the SQLite-backed stores, the in-memory LRUs and
+# the latency reports. Standard library only, so benchmarks can import it
+# without loading the app
+
+
+def open_sqlite(path, schema):
+    # One connection for every thread of the process, in WAL mode with
+    # `schema` applied; callers serialize access with their own lock
+    if os.path.dirname(path):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+    conn = sqlite3.connect(path, check_same_thread=False)
+    with conn:
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.executescript(schema)
+    return conn
+
+
+def lru_put(lru, key, value, max_size):
+    # Stores `value` as the most recent entry of an OrderedDict and drops the
+    # least recently used ones beyond `max_size`
+    lru[key] = value
+    lru.move_to_end(key)
+    while len(lru) > max_size:
+        lru.popitem(last=False)
+
+
+def percentile(samples, q):
+    # Nearest-rank percentile, q in [0, 1]; None without samples
+    samples = sorted(samples)
+    return samples[min(len(samples) - 1, int(round(q * (len(samples) - 1))))] if samples else None